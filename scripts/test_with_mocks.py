@@ -6,183 +6,243 @@ Test runner with comprehensive mocking
 import sys
 import os
 import asyncio
+import traceback
 import unittest
 import argparse
-import xml.etree.ElementTree as ET
+import functools
+import io
+from xml.sax.saxutils import quoteattr
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter_ns
 from unittest.mock import patch, MagicMock
 from datetime import datetime
+from pathlib import Path
 
-# Add src to path
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# Add src to path, resolved from this file so the script works from any directory
+ROOT_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT_DIR / "src"))
 
-# Test imports
-try:
-    from uir.models import SearchRequest, SearchResponse, SearchResult, ResponseMetadata
-    from uir.core.circuit_breaker import CircuitBreaker
-    from uir.core.rate_limiter import RateLimiter, TokenBucket
-    from uir.query_processor import QueryProcessor
-    from uir.aggregator import ResultAggregator
-    from uir.cache import CacheManager
-    from uir.auth import AuthManager
-    from uir.providers.google import GoogleAdapter
+# Shared instances, built once and reused by every test. Imports are local
+# so a run only loads the modules its selected tests need
+@functools.lru_cache(maxsize=None)
+def _embed():
     from uir.mocks.embedding_service import MockEmbeddingService
+    return MockEmbeddingService()
+
+@functools.lru_cache(maxsize=None)
+def _spell():
     from uir.mocks.spell_checker import MockSpellChecker
+    return MockSpellChecker()
+
+@functools.lru_cache(maxsize=None)
+def _entity():
     from uir.mocks.entity_extractor import MockEntityExtractor
-    print("✅ All imports successful!")
-except ImportError as e:
-    print(f"❌ Import error: {e}")
-    sys.exit(1)
+    return MockEntityExtractor()
 
-def test_circuit_breaker():
+@functools.lru_cache(maxsize=None)
+def _qp():
+    from uir.query_processor import QueryProcessor
+    return QueryProcessor(embedding_service=_embed())
+
+@functools.lru_cache(maxsize=None)
+def _auth():
+    from uir.auth import AuthManager
+    return AuthManager()
+
+@functools.lru_cache(maxsize=None)
+def _cache_mgr():
+    from uir.cache import CacheManager
+    return CacheManager()
+
+@functools.lru_cache(maxsize=None)
+def _google_adapter():
+    import httpx
+    from uir.models import ProviderConfig, ProviderType
+    from uir.providers.google import GoogleAdapter
+    
+    config = ProviderConfig(
+        name="google",
+        type=ProviderType.SEARCH_ENGINE,
+        auth_method="api_key",
+        credentials={"api_key": "test", "cx": "test"},
+        endpoints={"search": "https://www.googleapis.com/customsearch/v1"},
+        rate_limits={"default": 100},
+        retry_policy={"max_attempts": 3},
+        timeout_ms=5000
+    )
+    adapter = GoogleAdapter(config)
+    
+    # Serve any HTTP the adapter makes in-process so no test touches the network
+    adapter.client = httpx.AsyncClient(transport=httpx.MockTransport(_google_response))
+    return adapter
+
+def _google_response(request):
+    import httpx
+    
+    return httpx.Response(200, json={
+        "items": [{"title": "Test result", "link": "https://example.com", "snippet": "Test snippet"}],
+        "searchInformation": {"totalResults": "1"}
+    })
+
+async def test_circuit_breaker():
     """Test circuit breaker functionality"""
     print("\n🔧 Testing Circuit Breaker...")
     
-    async def run_test():
-        cb = CircuitBreaker(failure_threshold=2, recovery_timeout=1)
-        
-        # Test successful calls
-        async def success_func():
-            return "success"
-        
-        result = await cb.call(success_func)
-        assert result == "success"
-        print("  ✅ Success call works")
-        
-        # Test failure threshold
-        async def fail_func():
-            raise Exception("fail")
-        
-        try:
-            await cb.call(fail_func)
-            await cb.call(fail_func)  # Should open circuit
-        except Exception:
-            pass
-        
-        # Circuit should be open now
-        try:
-            await cb.call(success_func)
-            assert False, "Should have been blocked"
-        except Exception as e:
-            if "open" in str(e):
-                print("  ✅ Circuit opens after failures")
-        
-        print("  ✅ Circuit breaker tests passed!")
+    from uir.core.circuit_breaker import CircuitBreaker
+    
+    cb = CircuitBreaker(failure_threshold=2, recovery_timeout=1)
     
-    asyncio.run(run_test())
+    # Test successful calls
+    async def success_func():
+        return "success"
+    
+    result = await cb.call(success_func)
+    assert result == "success"
+    print("  ✅ Success call works")
+    
+    # Test failure threshold
+    async def fail_func():
+        raise Exception("fail")
+    
+    try:
+        await cb.call(fail_func)
+        await cb.call(fail_func)  # Should open circuit
+    except Exception:
+        pass
+    
+    # Circuit should be open now
+    try:
+        await cb.call(success_func)
+        assert False, "Should have been blocked"
+    except Exception as e:
+        if "open" in str(e):
+            print("  ✅ Circuit opens after failures")
+    
+    print("  ✅ Circuit breaker tests passed!")
 
-def test_rate_limiter():
+async def test_rate_limiter():
     """Test rate limiter functionality"""
     print("\n🚦 Testing Rate Limiter...")
     
-    async def run_test():
-        bucket = TokenBucket(capacity=3, refill_rate=3)
-        
-        # Should allow up to capacity
-        assert bucket.try_acquire() == True
-        assert bucket.try_acquire() == True
-        assert bucket.try_acquire() == True
-        
-        # Should block when exhausted
-        assert bucket.try_acquire() == False
-        
-        print("  ✅ Rate limiter tests passed!")
+    from uir.core.rate_limiter import TokenBucket
+    
+    bucket = TokenBucket(capacity=3, refill_rate=3)
+    
+    # Should allow up to capacity
+    assert bucket.try_acquire() == True
+    assert bucket.try_acquire() == True
+    assert bucket.try_acquire() == True
+    
+    # Should block when exhausted
+    assert bucket.try_acquire() == False
     
-    asyncio.run(run_test())
+    print("  ✅ Rate limiter tests passed!")
 
-def test_embedding_service():
+async def test_embedding_service():
     """Test mock embedding service"""
     print("\n🧠 Testing Mock Embedding Service...")
     
-    async def run_test():
-        service = MockEmbeddingService()
-        
-        # Test embedding generation
-        embedding = await service.embed("machine learning")
-        assert len(embedding) == 768
-        assert isinstance(embedding[0], float)
-        
-        # Test consistency
-        embedding2 = await service.embed("machine learning")
-        assert embedding == embedding2
-        
-        # Test similarity
-        embedding3 = await service.embed("deep learning")
-        similarity = service.similarity(embedding, embedding3)
-        assert 0.0 <= similarity <= 1.0
-        
-        print("  ✅ Mock embedding service works!")
+    import numpy as np
+    
+    service = _embed()
+    service.reset()
+    
+    # Test embedding generation
+    embedding = await service.embed("machine learning")
+    assert len(embedding) == 768
+    assert embedding.dtype == np.float32
+    
+    # Test consistency
+    embedding2 = await service.embed("machine learning")
+    assert np.array_equal(embedding, embedding2)
+    
+    # Test batched embedding matches single calls
+    batch = await service.embed_many(["machine learning", "deep learning"])
+    assert batch.shape == (2, 768)
+    assert np.array_equal(batch[0], embedding)
+    assert np.array_equal(await service.embed_batch(["machine learning", "deep learning"]), batch)
+    repeated = await service.embed_batch(["deep learning", "machine learning", "deep learning"])
+    assert np.array_equal(repeated, batch[[1, 0, 1]])
+    
+    # Test similarity
+    embedding3 = await service.embed("deep learning")
+    similarity = service.similarity(embedding, embedding3)
+    assert -1.0 <= similarity <= 1.0
+    
+    # Texts sharing a topic should score higher than unrelated ones
+    related = await service.embed("machine learning models")
+    assert service.similarity(embedding, related) > similarity
+    assert abs(service.similarity(embedding, embedding2) - 1.0) < 1e-5
     
-    asyncio.run(run_test())
+    # Batched similarity matches the pairwise scores
+    scores = await service.similarity_batch(embedding, ["deep learning", "machine learning models"])
+    assert np.allclose(scores, [similarity, service.similarity(embedding, related)], atol=1e-5)
+    
+    print("  ✅ Mock embedding service works!")
 
-def test_spell_checker():
+async def test_spell_checker():
     """Test mock spell checker"""
     print("\n📝 Testing Mock Spell Checker...")
     
-    async def run_test():
-        checker = MockSpellChecker()
-        
-        # Test corrections
-        result = await checker.correct("transformr atention mechanizm")
-        assert "transformer" in result
-        assert "attention" in result
-        assert "mechanism" in result
-        
-        # Test no change needed
-        result2 = await checker.correct("machine learning")
-        assert result2 == "machine learning"
-        
-        print("  ✅ Mock spell checker works!")
+    checker = _spell()
     
-    asyncio.run(run_test())
+    # Test corrections
+    result = await checker.correct("transformr atention mechanizm")
+    assert "transformer" in result
+    assert "attention" in result
+    assert "mechanism" in result
+    
+    # Test no change needed
+    result2 = await checker.correct("machine learning")
+    assert result2 == "machine learning"
+    
+    print("  ✅ Mock spell checker works!")
 
-def test_entity_extractor():
+async def test_entity_extractor():
     """Test mock entity extractor"""
     print("\n🏷️ Testing Mock Entity Extractor...")
     
-    async def run_test():
-        extractor = MockEntityExtractor()
-        
-        # Test entity extraction
-        entities = await extractor.extract("Contact john@example.com about transformer research from 2024-01-15")
-        
-        # Should find email, technology, and date entities
-        email_entities = [e for e in entities if e["type"] == "EMAIL"]
-        tech_entities = [e for e in entities if e["type"] == "TECHNOLOGY"]
-        date_entities = [e for e in entities if e["type"] == "DATE"]
-        
-        assert len(email_entities) > 0
-        assert len(tech_entities) > 0
-        assert len(date_entities) > 0
-        
-        print(f"  ✅ Found {len(entities)} entities: {len(email_entities)} email, {len(tech_entities)} tech, {len(date_entities)} date")
+    extractor = _entity()
+    
+    # Test entity extraction
+    entities = await extractor.extract("Contact john@example.com about transformer research from 2024-01-15")
     
-    asyncio.run(run_test())
+    # Should find email, technology, and date entities
+    email_entities = [e for e in entities if e["type"] == "EMAIL"]
+    tech_entities = [e for e in entities if e["type"] == "TECHNOLOGY"]
+    date_entities = [e for e in entities if e["type"] == "DATE"]
+    
+    assert len(email_entities) > 0
+    assert len(tech_entities) > 0
+    assert len(date_entities) > 0
+    
+    print(f"  ✅ Found {len(entities)} entities: {len(email_entities)} email, {len(tech_entities)} tech, {len(date_entities)} date")
 
-def test_query_processor():
+async def test_query_processor():
     """Test query processor with mocks"""
     print("\n🔍 Testing Query Processor...")
     
-    async def run_test():
-        processor = QueryProcessor()
-        
-        # Test full processing
-        result = await processor.process("transformr atention mechanizm")
-        
-        assert result.original == "transformr atention mechanizm"
-        assert result.corrected is not None
-        assert "transformer" in result.corrected
-        assert result.expanded is not None
-        assert len(result.embedding) == 768
-        assert result.keywords is not None
-        
-        print("  ✅ Query processor works with mocks!")
+    processor = _qp()
+    
+    # Test full processing
+    result = await processor.process("transformr atention mechanizm")
     
-    asyncio.run(run_test())
+    assert result.original == "transformr atention mechanizm"
+    assert result.corrected is not None
+    assert "transformer" in result.corrected
+    assert result.expanded is not None
+    assert len(result.embedding) == 768
+    assert result.keywords is not None
+    
+    print("  ✅ Query processor works with mocks!")
 
-def test_aggregator():
+async def test_aggregator():
     """Test result aggregator"""
     print("\n📊 Testing Result Aggregator...")
     
+    from uir.aggregator import ResultAggregator
+    from uir.models import SearchResult
+    
     aggregator = ResultAggregator()
     
     # Create test results
@@ -205,11 +265,11 @@ def test_aggregator():
     
     print("  ✅ Result aggregator works!")
 
-def test_auth():
+async def test_auth():
     """Test authentication"""
     print("\n🔐 Testing Authentication...")
     
-    auth = AuthManager()
+    auth = _auth()
     
     # Test API key creation
     api_key = auth.create_api_key(
@@ -230,118 +290,102 @@ def test_auth():
     
     print("  ✅ Authentication works!")
 
-def test_cache():
+async def test_cache():
     """Test cache with mocks"""
     print("\n💾 Testing Cache Manager...")
     
-    async def run_test():
-        cache = CacheManager()
-        await cache.initialize()
-        
-        # Create test request/response
-        request = SearchRequest(provider="google", query="test")
-        response = SearchResponse(
-            status="success",
-            request_id="test-123",
-            results=[],
-            metadata=ResponseMetadata(
-                query_time_ms=100,
-                providers_used=["google"],
-                cache_hit=False
-            )
+    from uir.models import SearchRequest, SearchResponse, ResponseMetadata
+    
+    cache = _cache_mgr()
+    await cache.initialize()
+    await cache.invalidate()
+    
+    # Create test request/response
+    request = SearchRequest(provider="google", query="test")
+    response = SearchResponse(
+        status="success",
+        request_id="test-123",
+        results=[],
+        metadata=ResponseMetadata(
+            query_time_ms=100,
+            providers_used=["google"],
+            cache_hit=False
         )
-        
-        # Test cache miss
-        result = await cache.get(request)
-        assert result is None
-        
-        # Test cache set/get
-        await cache.set(request, response)
-        result = await cache.get(request)
-        assert result is not None
-        assert result.request_id == "test-123"
-        
-        print("  ✅ Cache manager works with mocks!")
+    )
+    
+    # Test cache miss
+    result = await cache.get(request)
+    assert result is None
     
-    asyncio.run(run_test())
+    # Test cache set/get
+    await cache.set(request, response)
+    result = await cache.get(request)
+    assert result is not None
+    assert result.request_id == "test-123"
+    
+    print("  ✅ Cache manager works with mocks!")
 
-def test_providers():
+async def test_providers():
     """Test provider adapters with mocks"""
     print("\n🔌 Testing Provider Adapters...")
     
-    async def run_test():
-        from uir.models import ProviderConfig, ProviderType
-        
-        # Test Google adapter
-        config = ProviderConfig(
-            name="google",
-            type=ProviderType.SEARCH_ENGINE,
-            auth_method="api_key",
-            credentials={"api_key": "test", "cx": "test"},
-            endpoints={"search": "https://www.googleapis.com/customsearch/v1"},
-            rate_limits={"default": 100},
-            retry_policy={"max_attempts": 3},
-            timeout_ms=5000
-        )
-        
-        adapter = GoogleAdapter(config)
-        
-        # Test search
-        results = await adapter.search("test query", {"limit": 5})
-        assert isinstance(results, list)
-        assert len(results) <= 5
-        
-        if results:
-            assert isinstance(results[0], SearchResult)
-            assert results[0].provider == "google"
-        
-        # Test health check
-        health = await adapter.health_check()
-        assert health.provider == "google"
-        assert health.status in ["healthy", "degraded", "unhealthy"]
-        
-        print("  ✅ Provider adapters work with mocks!")
+    from uir.models import SearchResult
+    
+    # Test Google adapter
+    adapter = _google_adapter()
+    
+    # Test search
+    results = await adapter.search("test query", {"limit": 5})
+    assert isinstance(results, list)
+    assert len(results) <= 5
     
-    asyncio.run(run_test())
+    if results:
+        assert isinstance(results[0], SearchResult)
+        assert results[0].provider == "google"
+    
+    # Test health check
+    health = await adapter.health_check()
+    assert health.provider == "google"
+    assert health.status in ["healthy", "degraded", "unhealthy"]
+    
+    print("  ✅ Provider adapters work with mocks!")
+
+def _write_report(output_file, text):
+    """Write a report with a single unbuffered write"""
+    data = text.encode("utf-8")
+    fd = os.open(output_file, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
 
 def generate_junit_xml(test_results, output_file="test-results.xml"):
     """Generate JUnit XML report"""
-    testsuite = ET.Element("testsuite")
-    testsuite.set("name", "UIR Framework Tests")
-    testsuite.set("tests", str(len(test_results)))
-    testsuite.set("failures", str(sum(1 for r in test_results if not r[1])))
-    testsuite.set("time", "0.0")
-    testsuite.set("timestamp", datetime.now().isoformat())
+    failures = sum(1 for r in test_results if not r[1])
+    
+    # Write the document straight to a buffer instead of building a tree first
+    buf = io.StringIO()
+    buf.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+    buf.write(
+        f'<testsuite name="UIR Framework Tests" tests="{len(test_results)}" '
+        f'failures="{failures}" time="0.0" timestamp="{datetime.now().isoformat()}">\n'
+    )
     
     for test_name, passed, duration in test_results:
-        testcase = ET.SubElement(testsuite, "testcase")
-        testcase.set("classname", "UIRTests")
-        testcase.set("name", test_name)
-        testcase.set("time", str(duration))
-        
+        buf.write(f'<testcase classname="UIRTests" name={quoteattr(test_name)} time="{duration}">')
         if not passed:
-            failure = ET.SubElement(testcase, "failure")
-            failure.set("message", f"Test {test_name} failed")
-            failure.text = "Test failure"
+            buf.write(f'<failure message={quoteattr(f"Test {test_name} failed")}>Test failure</failure>')
+        buf.write('</testcase>\n')
+    
+    buf.write('</testsuite>\n')
     
-    tree = ET.ElementTree(testsuite)
-    tree.write(output_file, encoding="UTF-8", xml_declaration=True)
+    _write_report(output_file, buf.getvalue())
     print(f"JUnit XML report written to {output_file}")
 
 def generate_coverage_xml(output_file="coverage.xml"):
     """Generate mock coverage XML report"""
-    coverage = ET.Element("coverage")
-    coverage.set("version", "1.0")
-    coverage.set("timestamp", str(int(datetime.now().timestamp())))
-    
-    packages = ET.SubElement(coverage, "packages")
-    package = ET.SubElement(packages, "package")
-    package.set("name", "uir")
-    package.set("line-rate", "0.85")
-    package.set("branch-rate", "0.80")
-    
-    classes = ET.SubElement(package, "classes")
-    
     # Add mock coverage data for main modules
     modules = [
         ("uir.client", 0.90),
@@ -355,68 +399,122 @@ def generate_coverage_xml(output_file="coverage.xml"):
         ("uir.core.rate_limiter", 0.89),
     ]
     
-    for module_name, coverage_rate in modules:
-        class_elem = ET.SubElement(classes, "class")
-        class_elem.set("name", module_name)
-        class_elem.set("filename", f"src/{module_name.replace('.', '/')}.py")
-        class_elem.set("line-rate", str(coverage_rate))
-        class_elem.set("branch-rate", str(coverage_rate * 0.95))
+    rows = "".join(
+        f'<class name="{module_name}" filename="src/{module_name.replace(".", "/")}.py" '
+        f'line-rate="{coverage_rate}" branch-rate="{coverage_rate * 0.95}" />'
+        for module_name, coverage_rate in modules
+    )
     
-    tree = ET.ElementTree(coverage)
-    tree.write(output_file, encoding="UTF-8", xml_declaration=True)
+    _write_report(
+        output_file,
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        f'<coverage version="1.0" timestamp="{int(datetime.now().timestamp())}">'
+        '<packages><package name="uir" line-rate="0.85" branch-rate="0.80">'
+        f'<classes>{rows}</classes>'
+        '</package></packages></coverage>'
+    )
     print(f"Coverage XML report written to {output_file}")
 
+IO_TESTS = [
+    ("CircuitBreaker", test_circuit_breaker),
+    ("RateLimiter", test_rate_limiter),
+    ("CacheManager", test_cache),
+    ("ProviderAdapters", test_providers),
+]
+
+CPU_TESTS = [
+    ("EmbeddingService", test_embedding_service),
+    ("SpellChecker", test_spell_checker),
+    ("EntityExtractor", test_entity_extractor),
+    ("QueryProcessor", test_query_processor),
+    ("Aggregator", test_aggregator),
+    ("Authentication", test_auth),
+]
+
+async def _gather_timed(test_functions):
+    """Run test coroutines concurrently on one event loop, timing each one"""
+    async def timed(coro):
+        start_ns = perf_counter_ns()
+        await coro
+        return (perf_counter_ns() - start_ns) / 1e9
+    
+    durations = await asyncio.gather(
+        *(timed(test_func()) for _, test_func in test_functions),
+        return_exceptions=True
+    )
+    
+    return [
+        (test_name, duration, 0.0) if isinstance(duration, BaseException)
+        else (test_name, None, duration)
+        for (test_name, _), duration in zip(test_functions, durations)
+    ]
+
+def _run_timed(test_func):
+    """Run one async test in a worker process and return its duration"""
+    start_ns = perf_counter_ns()
+    asyncio.run(test_func())
+    return (perf_counter_ns() - start_ns) / 1e9
+
+def _run_tests(io_tests, cpu_tests):
+    """Run CPU-bound tests in worker processes while the I/O-bound ones share this process's event loop"""
+    # A pool only pays for its startup when there are CPU tests to overlap
+    if len(cpu_tests) < 2:
+        return asyncio.run(_gather_timed(io_tests + cpu_tests))
+    
+    with ProcessPoolExecutor(max_workers=min(len(cpu_tests), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(_run_timed, test_func) for _, test_func in cpu_tests]
+        outcomes = asyncio.run(_gather_timed(io_tests))
+        
+        for (test_name, _), future in zip(cpu_tests, futures):
+            error = future.exception()
+            outcomes.append((test_name, error, 0.0 if error else future.result()))
+    
+    return outcomes
+
 def main():
     """Run all tests"""
     parser = argparse.ArgumentParser(description="UIR Framework Test Runner")
     parser.add_argument("--coverage", action="store_true", help="Generate coverage report")
     parser.add_argument("--junit", action="store_true", help="Generate JUnit XML report")
+    parser.add_argument(
+        "--only",
+        choices=[test_name for test_name, _ in IO_TESTS + CPU_TESTS],
+        help="Run a single test"
+    )
     args = parser.parse_args()
     
     print("UIR Framework Test Suite with Comprehensive Mocks")
     print("=" * 60)
     
-    test_results = []
-    test_functions = [
-        ("CircuitBreaker", test_circuit_breaker),
-        ("RateLimiter", test_rate_limiter),
-        ("EmbeddingService", test_embedding_service),
-        ("SpellChecker", test_spell_checker),
-        ("EntityExtractor", test_entity_extractor),
-        ("QueryProcessor", test_query_processor),
-        ("Aggregator", test_aggregator),
-        ("Authentication", test_auth),
-        ("CacheManager", test_cache),
-        ("ProviderAdapters", test_providers),
-    ]
+    io_tests = [t for t in IO_TESTS if args.only in (None, t[0])]
+    cpu_tests = [t for t in CPU_TESTS if args.only in (None, t[0])]
+    outcomes = _run_tests(io_tests, cpu_tests)
     
+    test_results = []
     all_passed = True
-    for test_name, test_func in test_functions:
-        try:
-            import time
-            start_time = time.time()
-            test_func()
-            duration = time.time() - start_time
+    for test_name, error, duration in outcomes:
+        if error is None:
             test_results.append((test_name, True, duration))
-        except Exception as e:
-            print(f"\nTest {test_name} failed: {e}")
-            import traceback
-            traceback.print_exc()
+        else:
+            print(f"\nTest {test_name} failed: {error}")
+            traceback.print_exception(type(error), error, error.__traceback__)
             test_results.append((test_name, False, 0.0))
             all_passed = False
     
-    print("\n" + "=" * 60)
-    
     if all_passed:
-        print("ALL TESTS PASSED!")
-        print("Mock implementations are working correctly")
-        print("Core functionality is operational")
-        print("External dependencies are properly mocked")
+        lines = [
+            "ALL TESTS PASSED!",
+            "Mock implementations are working correctly",
+            "Core functionality is operational",
+            "External dependencies are properly mocked",
+        ]
         exit_code = 0
     else:
-        print("SOME TESTS FAILED!")
+        lines = ["SOME TESTS FAILED!"]
         exit_code = 1
     
+    sys.stdout.write("\n".join(["", "=" * 60, *lines]) + "\n")
+    
     # Generate reports if requested
     if args.junit:
         generate_junit_xml(test_results)
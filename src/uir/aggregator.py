@@ -1,14 +1,57 @@
 """Result aggregation and fusion service"""
 
-from typing import Dict, List, Any, Optional
+import re
+from typing import Dict, List, Any, Optional, Tuple, Union
 from collections import defaultdict
+from operator import attrgetter
 import hashlib
+import numpy as np
 import structlog
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
 
 from .models import SearchResult
 
 logger = structlog.get_logger()
 
+_WORD_RE = re.compile(r"\w+")
+_by_score = attrgetter("score")
+
+
+def _fast_netloc(url: str) -> str:
+    """Extract the host from a URL, without credentials or port"""
+    # A plain str.find scan; urlsplit's scheme validation and normalization
+    # dominate domain extraction when diversifying large result sets
+    scheme_end = url.find("://")
+    # A "://" after the first "/", "?" or "#" is in the path or query, not a scheme
+    if scheme_end >= 0 and any(url.find(d, 0, scheme_end) >= 0 for d in "/?#"):
+        scheme_end = -1
+    if scheme_end >= 0:
+        start = scheme_end + 3
+    elif url.startswith("//"):
+        start = 2
+    else:
+        start = 0
+    
+    end = len(url)
+    for delimiter in "/?#":
+        index = url.find(delimiter, start, end)
+        if index >= 0:
+            end = index
+    host = url[start:end]
+    
+    # Drop user info, then a port (but not the colons of an IPv6 literal)
+    at = host.rfind("@")
+    if at >= 0:
+        host = host[at + 1:]
+    colon = host.rfind(":")
+    if colon > host.rfind("]"):
+        host = host[:colon]
+    
+    return host
+
 
 class ResultAggregator:
     """Aggregates and ranks search results from multiple providers"""
@@ -29,118 +72,141 @@ class ResultAggregator:
             results = self._deduplicate(results)
         
         # Sort by score
-        results.sort(key=lambda x: x.score, reverse=True)
+        results.sort(key=_by_score, reverse=True)
         
         return results
     
     def _deduplicate(self, results: List[SearchResult]) -> List[SearchResult]:
         """Remove duplicate results based on content similarity"""
-        seen = {}
-        unique_results = []
+        # Results keyed by distinct URLs can't collide, so there is nothing to drop
+        urls = [result.url for result in results]
+        if all(urls) and len(set(urls)) == len(urls):
+            return list(results)
+        
+        # Map each content hash to its best result; dicts keep first-seen
+        # order, so a replacement takes the position of the original
+        best = {}
         
         for result in results:
             # Generate hash for deduplication
             content_hash = self._get_content_hash(result)
             
-            if content_hash not in seen:
-                seen[content_hash] = result
-                unique_results.append(result)
-            else:
-                # Keep the result with higher score
-                if result.score > seen[content_hash].score:
-                    # Replace with higher scoring result
-                    idx = unique_results.index(seen[content_hash])
-                    unique_results[idx] = result
-                    seen[content_hash] = result
-        
-        return unique_results
+            kept = best.get(content_hash)
+            if kept is None or result.score > kept.score:
+                best[content_hash] = result
+        
+        return list(best.values())
     
-    def _get_content_hash(self, result: SearchResult) -> str:
+    def _get_content_hash(self, result: SearchResult) -> Union[str, int]:
         """Generate hash for result deduplication"""
-        # Use URL if available, otherwise use title and content
+        # The URL is already a unique key, and str caches its own hash
         if result.url:
-            return hashlib.md5(result.url.encode()).hexdigest()
+            return result.url
+        
+        # Memoized on the result, which is usually seen by several passes
+        if result._content_hash is not None:
+            return result._content_hash
+        
+        # Without a URL, use title and content; one digest over the joined
+        # fields measured faster than update() per field, even for long content
+        key = f"{result.title or ''}{result.content or ''}{result.snippet or ''}".encode()
         
-        content = f"{result.title or ''}{result.content or ''}{result.snippet or ''}"
-        return hashlib.md5(content.encode()).hexdigest()
+        # Only used as a dict key, so a fast non-cryptographic 64-bit hash will
+        # do; BLAKE2b is the stdlib fallback when xxhash is not installed
+        if xxhash:
+            content_hash = xxhash.xxh3_64_intdigest(key)
+        else:
+            content_hash = int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "little")
+        
+        result._content_hash = content_hash
+        return content_hash
     
-    def reciprocal_rank_fusion(
+    def _fuse(
         self,
         result_lists: List[List[SearchResult]],
-        k: int = 60
+        method: str,
+        k: int = 60,
+        top_k: Optional[int] = None
     ) -> List[SearchResult]:
-        """Reciprocal Rank Fusion for combining multiple ranked lists"""
-        scores = defaultdict(float)
-        result_map = {}
-        
-        for result_list in result_lists:
-            for rank, result in enumerate(result_list, 1):
-                result_id = self._get_content_hash(result)
-                scores[result_id] += 1.0 / (k + rank)
-                
-                # Store the result object
-                if result_id not in result_map:
-                    result_map[result_id] = result
-        
-        # Create final ranked list
+        """Fuse ranked lists with vectorized per-result score accumulation"""
+        results = [result for result_list in result_lists for result in result_list]
+        if not results:
+            return []
+        
+        # Compact dedup keys to 0..n_unique-1, numbered in order of first
+        # appearance so that ties keep the order the results were seen in
+        group_ids = {}
+        group = np.fromiter(
+            (group_ids.setdefault(self._get_content_hash(result), len(group_ids)) for result in results),
+            dtype=np.intp, count=len(results)
+        )
+        scores = np.fromiter((result.score for result in results), dtype=np.float64, count=len(results))
+        
+        fused = np.zeros(len(group_ids), dtype=np.float64)
+        if method == "rrf":
+            ranks = np.concatenate([np.arange(1, len(result_list) + 1) for result_list in result_lists])
+            np.add.at(fused, group, 1.0 / (k + ranks))
+        elif method == "sum":
+            np.add.at(fused, group, scores)
+        else:
+            fused[:] = -np.inf
+            np.maximum.at(fused, group, scores)
+        
+        # Representative per result: first occurrence for RRF, otherwise the
+        # first occurrence with the highest individual score
+        positions = np.arange(len(results))
+        if method == "rrf":
+            order = np.lexsort((positions, group))
+        else:
+            order = np.lexsort((positions, -scores, group))
+        is_first = np.ones(len(order), dtype=bool)
+        is_first[1:] = group[order][1:] != group[order][:-1]
+        representative = order[is_first]
+        
+        # Stable descending order by fused score, optionally cut to top_k
+        if top_k is not None and top_k < len(fused):
+            if top_k <= 0:
+                return []
+            threshold = -np.partition(-fused, top_k - 1)[top_k - 1]
+            above = np.flatnonzero(fused > threshold)
+            tied = np.flatnonzero(fused == threshold)[:top_k - len(above)]
+            candidates = np.sort(np.concatenate([above, tied]))
+        else:
+            candidates = np.arange(len(fused))
+        ranked = candidates[np.argsort(-fused[candidates], kind="stable")]
+        
         final_results = []
-        for result_id, score in sorted(scores.items(), key=lambda x: x[1], reverse=True):
-            result = result_map[result_id]
-            result.score = score  # Update score with RRF score
+        for group_id in ranked:
+            result = results[representative[group_id]]
+            result.score = float(fused[group_id])
             final_results.append(result)
         
         return final_results
     
+    def reciprocal_rank_fusion(
+        self,
+        result_lists: List[List[SearchResult]],
+        k: int = 60,
+        top_k: Optional[int] = None
+    ) -> List[SearchResult]:
+        """Reciprocal Rank Fusion for combining multiple ranked lists"""
+        return self._fuse(result_lists, "rrf", k=k, top_k=top_k)
+    
     def weighted_sum_fusion(
         self,
-        result_lists: List[List[SearchResult]]
+        result_lists: List[List[SearchResult]],
+        top_k: Optional[int] = None
     ) -> List[SearchResult]:
         """Weighted sum fusion for combining results"""
-        scores = defaultdict(float)
-        result_map = {}
-        
-        for result_list in result_lists:
-            for result in result_list:
-                result_id = self._get_content_hash(result)
-                scores[result_id] += result.score
-                
-                # Store the result with highest individual score
-                if result_id not in result_map or result.score > result_map[result_id].score:
-                    result_map[result_id] = result
-        
-        # Create final ranked list
-        final_results = []
-        for result_id, total_score in sorted(scores.items(), key=lambda x: x[1], reverse=True):
-            result = result_map[result_id]
-            result.score = total_score
-            final_results.append(result)
-        
-        return final_results
+        return self._fuse(result_lists, "sum", top_k=top_k)
     
     def max_score_fusion(
         self,
-        result_lists: List[List[SearchResult]]
+        result_lists: List[List[SearchResult]],
+        top_k: Optional[int] = None
     ) -> List[SearchResult]:
         """Max score fusion - take maximum score for each result"""
-        best_scores = {}
-        result_map = {}
-        
-        for result_list in result_lists:
-            for result in result_list:
-                result_id = self._get_content_hash(result)
-                
-                if result_id not in best_scores or result.score > best_scores[result_id]:
-                    best_scores[result_id] = result.score
-                    result_map[result_id] = result
-        
-        # Create final ranked list
-        final_results = []
-        for result_id, score in sorted(best_scores.items(), key=lambda x: x[1], reverse=True):
-            result = result_map[result_id]
-            result.score = score
-            final_results.append(result)
-        
-        return final_results
+        return self._fuse(result_lists, "max", top_k=top_k)
     
     async def rerank(
         self,
@@ -152,19 +218,26 @@ class ResultAggregator:
         # In production, this would use a real reranking model
         # For now, we'll do a simple relevance boost based on query terms
         
-        query_terms = set(query.lower().split())
+        query_terms = set(_WORD_RE.findall(query.lower()))
         
         for result in results:
-            # Calculate relevance boost
-            content = f"{result.title or ''} {result.content or ''} {result.snippet or ''}".lower()
-            matching_terms = sum(1 for term in query_terms if term in content)
+            # Calculate relevance boost from the query words the result contains,
+            # checking the short fields first so long content is only scanned
+            # while some query words are still unmatched
+            unmatched = set(query_terms)
+            for field in self._get_lowered(result):
+                if not unmatched:
+                    break
+                if field:
+                    unmatched.difference_update(_WORD_RE.findall(field))
+            matching_terms = len(query_terms) - len(unmatched)
             
             # Apply boost to score
             relevance_boost = matching_terms / len(query_terms) if query_terms else 0
             result.score = result.score * (1 + relevance_boost * 0.5)
         
         # Re-sort by new scores
-        results.sort(key=lambda x: x.score, reverse=True)
+        results.sort(key=_by_score, reverse=True)
         
         return results
     
@@ -178,46 +251,44 @@ class ResultAggregator:
         if not results:
             return []
         
-        diversified = [results[0]]  # Always include top result
-        similarity_counts = defaultdict(int)
+        # Cap how many results share a domain (or, without a URL, a title
+        # prefix) in one pass instead of comparing against every selection
+        diversified = []
+        group_counts = defaultdict(int)
         
-        for result in results[1:]:
-            # Check similarity with already selected results
-            is_too_similar = False
-            
-            for selected in diversified:
-                if self._are_similar(result, selected):
-                    result_domain = self._get_domain(result)
-                    similarity_counts[result_domain] += 1
-                    
-                    if similarity_counts[result_domain] >= max_similar:
-                        is_too_similar = True
-                        break
+        for result in results:
+            if result.url:
+                group = ("domain", self._get_domain(result))
+            elif result.title:
+                group = ("title", self._get_lowered(result)[0][:50])
+            else:
+                diversified.append(result)
+                continue
             
-            if not is_too_similar:
+            # The top result is always included
+            if group_counts[group] < max_similar or not diversified:
                 diversified.append(result)
+            group_counts[group] += 1
         
         return diversified
     
-    def _are_similar(self, result1: SearchResult, result2: SearchResult) -> bool:
-        """Check if two results are similar"""
-        # Simple domain-based similarity for URLs
-        if result1.url and result2.url:
-            return self._get_domain(result1) == self._get_domain(result2)
-        
-        # Title similarity
-        if result1.title and result2.title:
-            # Simple check - in production would use better similarity metrics
-            return result1.title.lower()[:50] == result2.title.lower()[:50]
-        
-        return False
+    def _get_lowered(self, result: SearchResult) -> Tuple[str, str, str]:
+        """Get the lowercased title, snippet and content of a result"""
+        # Memoized on the result so rerank and diversify lowercase each field once
+        if result._lowered is None:
+            result._lowered = (
+                (result.title or "").lower(),
+                (result.snippet or "").lower(),
+                (result.content or "").lower()
+            )
+        return result._lowered
     
     def _get_domain(self, result: SearchResult) -> str:
         """Extract domain from URL"""
         if not result.url:
             return ""
         
-        # Simple domain extraction
-        from urllib.parse import urlparse
-        parsed = urlparse(result.url)
-        return parsed.netloc
\ No newline at end of file
+        # Memoized on the result so repeated passes skip the URL parse
+        if result._domain is None:
+            result._domain = _fast_netloc(result.url)
+        return result._domain
\ No newline at end of file
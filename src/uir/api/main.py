@@ -4,6 +4,7 @@ from fastapi import FastAPI, HTTPException, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from typing import Optional, Dict, Any
+import asyncio
 import os
 import structlog
 
@@ -12,6 +13,10 @@ from ..models import (
     SearchResponse,
     VectorSearchRequest,
     HybridSearchRequest,
+    BatchSearchRequest,
+    BatchSearchResponse,
+    RAGChunk,
+    RAGResponse,
     QueryAnalysis
 )
 from ..router import RouterService
@@ -198,6 +203,68 @@ async def search(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@app.post("/batch/search", response_model=BatchSearchResponse)
+async def batch_search(
+    request: BatchSearchRequest,
+    key_data: Dict = Depends(verify_api_key)
+):
+    """Execute several text searches, serving cache hits from one batched lookup"""
+    try:
+        # Check permission
+        if not auth_manager.check_permission(key_data, "search"):
+            raise HTTPException(status_code=403, detail="Permission denied")
+        
+        search_requests = request.queries
+        parallel = (request.options or {}).get("parallel", True)
+        
+        # Prefetch every cacheable request with a single MGET, keeping each
+        # key for the write below
+        responses = [None] * len(search_requests)
+        cache_keys = {}
+        if cache_manager:
+            cache_keys = {
+                i: cache_manager.cache_key(search_request)
+                for i, search_request in enumerate(search_requests)
+                if search_request.options and search_request.options.cache
+            }
+        if cache_keys:
+            cached = await cache_manager.get_many(
+                [search_requests[i] for i in cache_keys],
+                list(cache_keys.values())
+            )
+            for i, cached_response in zip(cache_keys, cached):
+                responses[i] = cached_response
+        
+        # Run the misses without a second per-request cache lookup
+        misses = [i for i, response in enumerate(responses) if response is None]
+        if parallel:
+            fresh = await asyncio.gather(
+                *(router_service.search(search_requests[i], use_cache=False) for i in misses)
+            )
+        else:
+            fresh = [
+                await router_service.search(search_requests[i], use_cache=False)
+                for i in misses
+            ]
+        for i, response in zip(misses, fresh):
+            responses[i] = response
+        
+        # Store the fresh cacheable responses in one pipelined write
+        to_store = [i for i in misses if i in cache_keys and responses[i].status != "error"]
+        if to_store:
+            await cache_manager.set_many(
+                [(search_requests[i], responses[i]) for i in to_store],
+                [cache_keys[i] for i in to_store]
+            )
+        
+        return BatchSearchResponse(results=responses)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Batch search error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
 @app.post("/vector/search", response_model=SearchResponse)
 async def vector_search(
     request: VectorSearchRequest,
@@ -284,7 +351,7 @@ async def get_usage(
     }
 
 
-@app.post("/rag/retrieve")
+@app.post("/rag/retrieve", response_model=RAGResponse)
 async def rag_retrieve(
     request: Dict[str, Any],
     key_data: Dict = Depends(verify_api_key)
@@ -304,25 +371,29 @@ async def rag_retrieve(
         
         response = await router_service.search(search_request)
         
-        # Format for RAG
+        # Format for RAG, collecting the context text in the same pass
         chunks = []
+        text_parts = []
         for result in response.results[:request.get("options", {}).get("num_chunks", 5)]:
-            chunks.append({
-                "text": result.content or result.snippet,
-                "source": result.url or result.id,
-                "score": result.score,
-                "metadata": result.metadata
-            })
+            text = result.content or result.snippet
+            chunks.append(RAGChunk(
+                text=text,
+                source=result.url or result.id,
+                score=result.score,
+                metadata=result.metadata
+            ))
+            if text:
+                text_parts.append(text)
         
-        return {
-            "status": "success",
-            "context": "\n\n".join([c["text"] for c in chunks if c["text"]]),
-            "chunks": chunks,
-            "metadata": {
+        return RAGResponse(
+            status="success",
+            context="\n\n".join(text_parts),
+            chunks=chunks,
+            metadata={
                 "providers_queried": response.metadata.providers_used,
                 "query_time_ms": response.metadata.query_time_ms
             }
-        }
+        )
     except Exception as e:
         logger.error(f"RAG retrieval error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -1,8 +1,13 @@
 """Authentication and authorization module"""
 
+import base64
 import hashlib
+import hmac
 import secrets
-from typing import Dict, List, Optional, Any
+import threading
+import time
+from collections import deque
+from typing import Deque, Dict, List, Optional, Tuple, Any
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
@@ -18,16 +23,29 @@ class AuthManager:
         self,
         secret_key: str = None,
         algorithm: str = "HS256",
-        access_token_expire_minutes: int = 30
+        access_token_expire_minutes: int = 30,
+        validation_cache_ttl: float = 1.0,
+        validation_cache_size: int = 10000
     ):
         self.secret_key = secret_key or secrets.token_urlsafe(32)
         self.algorithm = algorithm
         self.access_token_expire_minutes = access_token_expire_minutes
         self.pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
         self.api_keys: Dict[str, Dict[str, Any]] = {}
-        self.api_key_store: Dict[str, str] = {}  # Store raw key -> hash mapping
         self.users: Dict[str, Dict[str, Any]] = {}
+        self._users_by_id: Dict[str, Dict[str, Any]] = {}
         self.logger = logger.bind(component="auth")
+        
+        # Derive the API key MAC key once, separate from the JWT signing use
+        self._mac_key = hashlib.blake2b(
+            self.secret_key.encode(), digest_size=32, person=b"uir-api-key"
+        ).digest()
+        
+        # Recently validated keys, so hot keys skip the signature check and
+        # hash on repeat requests: api_key -> (monotonic deadline, key_data)
+        self.validation_cache_ttl = validation_cache_ttl
+        self.validation_cache_size = validation_cache_size
+        self._validation_cache: Dict[str, Tuple[float, Dict[str, Any]]] = {}
     
     def create_api_key(
         self,
@@ -38,10 +56,11 @@ class AuthManager:
         expires_at: Optional[datetime] = None
     ) -> str:
         """Create new API key"""
-        api_key = f"uir_{secrets.token_urlsafe(32)}"
+        token = secrets.token_urlsafe(32)
+        api_key = f"uir_{token}.{self._sign_token(token)}"
         api_key_hash = self._hash_api_key(api_key)
         
-        # Store both the hash and the mapping
+        # Only the hash is stored; the raw key is returned to the caller once
         self.api_keys[api_key_hash] = {
             "user_id": user_id,
             "name": name,
@@ -53,37 +72,58 @@ class AuthManager:
             "usage_count": 0
         }
         
-        # Store raw key to hash mapping for validation
-        self.api_key_store[api_key] = api_key_hash
-        
         self.logger.info(f"Created API key for user {user_id}")
         return api_key
     
     def validate_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
         """Validate API key and return associated data"""
-        # Check if key exists in our store
-        if api_key not in self.api_key_store:
-            return None
+        now = time.monotonic()
+        cached = self._validation_cache.get(api_key)
         
-        # Get the hash from our store
-        api_key_hash = self.api_key_store[api_key]
-        
-        if api_key_hash not in self.api_keys:
-            return None
+        if cached is not None and cached[0] > now:
+            key_data = cached[1]
+        else:
+            key_data = self._lookup_api_key(api_key)
+            if key_data is None:
+                self._validation_cache.pop(api_key, None)
+                return None
+            
+            # Bound memory by starting over rather than tracking recency
+            if len(self._validation_cache) >= self.validation_cache_size:
+                self._validation_cache.clear()
+            self._validation_cache[api_key] = (now + self.validation_cache_ttl, key_data)
         
-        key_data = self.api_keys[api_key_hash]
+        # One wall-clock read serves both the expiry check and last_used,
+        # which is kept as a datetime because key_data is handed to callers
+        wall_now = datetime.now()
         
         # Check expiration
-        if key_data.get("expires_at") and key_data["expires_at"] < datetime.now():
-            self.logger.warning(f"Expired API key used: {api_key_hash[:8]}...")
+        expires_at = key_data.get("expires_at")
+        if expires_at and expires_at < wall_now:
+            self.logger.warning(f"Expired API key used: {self._hash_api_key(api_key)[:8]}...")
+            self._validation_cache.pop(api_key, None)
             return None
         
         # Update usage stats
-        key_data["last_used"] = datetime.now()
+        key_data["last_used"] = wall_now
         key_data["usage_count"] += 1
         
         return key_data
     
+    def _lookup_api_key(self, api_key: str) -> Optional[Dict[str, Any]]:
+        """Check an API key's signature and find its stored data"""
+        if not api_key.startswith("uir_"):
+            return None
+        
+        # Reject forged or malformed keys before looking anything up
+        token, _, signature = api_key[4:].rpartition(".")
+        if not token or not hmac.compare_digest(
+            signature.encode(), self._sign_token(token).encode()
+        ):
+            return None
+        
+        return self.api_keys.get(self._hash_api_key(api_key))
+    
     def create_access_token(
         self,
         data: Dict[str, Any],
@@ -129,9 +169,14 @@ class AuthManager:
         """Get rate limit for API key"""
         return key_data.get("rate_limit")
     
+    def _sign_token(self, token: str) -> str:
+        """Compute the signature suffix embedded in an API key"""
+        digest = hmac.new(self._mac_key, token.encode(), hashlib.sha256).digest()[:16]
+        return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+    
     def _hash_api_key(self, api_key: str) -> str:
-        """Hash API key for storage using a secure password hashing algorithm (bcrypt)"""
-        return self.pwd_context.hash(api_key)
+        """Hash API key for storage with HMAC-SHA256 under the derived MAC key"""
+        return hmac.new(self._mac_key, api_key.encode(), hashlib.sha256).hexdigest()
     
     def create_user(
         self,
@@ -144,7 +189,12 @@ class AuthManager:
         user_id = secrets.token_urlsafe(16)
         password_hash = self.pwd_context.hash(password)
         
-        self.users[email] = {
+        # Re-creating a user replaces the old account, including its ID
+        previous = self.users.get(email)
+        if previous is not None:
+            self._users_by_id.pop(previous["user_id"], None)
+        
+        user = {
             "user_id": user_id,
             "email": email,
             "password_hash": password_hash,
@@ -153,6 +203,8 @@ class AuthManager:
             "created_at": datetime.now(),
             "last_login": None
         }
+        self.users[email] = user
+        self._users_by_id[user_id] = user
         
         self.logger.info(f"Created user: {email}")
         return user_id
@@ -172,19 +224,35 @@ class AuthManager:
     
     def get_user_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
-        for user in self.users.values():
-            if user["user_id"] == user_id:
-                return user
-        return None
+        return self._users_by_id.get(user_id)
 
 
 class RateLimitManager:
     """Manages rate limiting for API requests"""
     
+    # Number of independently locked shards; must be a power of two
+    SHARD_COUNT = 16
+    
     def __init__(self):
-        self.request_counts: Dict[str, List[datetime]] = {}
+        # Per identifier, monotonic request timestamps in arrival (ascending) order,
+        # spread over shards so concurrent requests rarely contend on one lock
+        self._shards: List[Dict[str, Deque[float]]] = [{} for _ in range(self.SHARD_COUNT)]
+        self._locks = [threading.Lock() for _ in range(self.SHARD_COUNT)]
         self.logger = logger.bind(component="rate_limiter")
     
+    def _shard(self, identifier: str) -> Tuple[Dict[str, Deque[float]], threading.Lock]:
+        """Get the shard and lock that own an identifier"""
+        index = hash(identifier) & (self.SHARD_COUNT - 1)
+        return self._shards[index], self._locks[index]
+    
+    @staticmethod
+    def _evict(timestamps: Deque[float], window_seconds: int) -> None:
+        """Drop timestamps that fall outside the window"""
+        # Oldest first, so expired entries are always at the left
+        cutoff = time.monotonic() - window_seconds
+        while timestamps and timestamps[0] <= cutoff:
+            timestamps.popleft()
+    
     def check_rate_limit(
         self,
         identifier: str,
@@ -192,30 +260,26 @@ class RateLimitManager:
         window_seconds: int = 60
     ) -> bool:
         """Check if request is within rate limit"""
-        now = datetime.now()
-        
-        # Initialize if first request
-        if identifier not in self.request_counts:
-            self.request_counts[identifier] = []
-        
-        # Remove old requests outside window
-        cutoff = now - timedelta(seconds=window_seconds)
-        self.request_counts[identifier] = [
-            ts for ts in self.request_counts[identifier]
-            if ts > cutoff
-        ]
-        
-        # Check if within limit
-        if len(self.request_counts[identifier]) >= limit:
-            self.logger.warning(
-                f"Rate limit exceeded for {identifier}: "
-                f"{len(self.request_counts[identifier])}/{limit}"
-            )
-            return False
-        
-        # Add current request
-        self.request_counts[identifier].append(now)
-        return True
+        shard, lock = self._shard(identifier)
+        
+        with lock:
+            timestamps = shard.get(identifier)
+            if timestamps is None:
+                timestamps = shard[identifier] = deque()
+            self._evict(timestamps, window_seconds)
+            
+            # Check if within limit
+            count = len(timestamps)
+            if count < limit:
+                # Add current request
+                timestamps.append(time.monotonic())
+                return True
+        
+        self.logger.warning(
+            f"Rate limit exceeded for {identifier}: "
+            f"{count}/{limit}"
+        )
+        return False
     
     def get_remaining_requests(
         self,
@@ -224,19 +288,14 @@ class RateLimitManager:
         window_seconds: int = 60
     ) -> int:
         """Get number of remaining requests in current window"""
-        now = datetime.now()
-        
-        if identifier not in self.request_counts:
-            return limit
-        
-        # Count requests in current window
-        cutoff = now - timedelta(seconds=window_seconds)
-        current_count = sum(
-            1 for ts in self.request_counts[identifier]
-            if ts > cutoff
-        )
+        shard, lock = self._shard(identifier)
         
-        return max(0, limit - current_count)
+        with lock:
+            timestamps = shard.get(identifier)
+            if timestamps is None:
+                return limit
+            self._evict(timestamps, window_seconds)
+            return max(0, limit - len(timestamps))
     
     def get_reset_time(
         self,
@@ -244,9 +303,17 @@ class RateLimitManager:
         window_seconds: int = 60
     ) -> Optional[datetime]:
         """Get time when rate limit resets"""
-        if identifier not in self.request_counts or not self.request_counts[identifier]:
-            return None
+        shard, lock = self._shard(identifier)
+        
+        with lock:
+            timestamps = shard.get(identifier)
+            if not timestamps:
+                return None
+            self._evict(timestamps, window_seconds)
+            if not timestamps:
+                return None
+            
+            # The oldest request in the window is the first to expire
+            remaining = timestamps[0] + window_seconds - time.monotonic()
         
-        # Find oldest request in window
-        oldest = min(self.request_counts[identifier])
-        return oldest + timedelta(seconds=window_seconds)
\ No newline at end of file
+        return datetime.now() + timedelta(seconds=remaining)
\ No newline at end of file
@@ -1,10 +1,15 @@
 """Caching layer for UIR framework"""
 
-import json
 import hashlib
 import asyncio
-from typing import Dict, Any, Optional, Union
-from datetime import datetime, timedelta
+import struct
+import time
+import orjson
+from pydantic import TypeAdapter
+from typing import Awaitable, Callable, Dict, List, Any, NamedTuple, Optional, Set, Tuple, Union
+from collections import OrderedDict, defaultdict
+from functools import lru_cache
+from itertools import islice
 try:
     import redis.asyncio as redis
 except ImportError:
@@ -17,6 +22,26 @@ from .models import SearchRequest, SearchResponse, VectorSearchRequest
 
 logger = structlog.get_logger()
 
+# Built once so cache reads and writes go straight between bytes and model
+_RESP_ADAPTER = TypeAdapter(SearchResponse)
+
+
+class _CacheEntry(NamedTuple):
+    """Local cache entry; a plain tuple, smaller and faster than a dict"""
+    data: SearchResponse
+    expires_at: float  # time.monotonic() deadline
+
+
+@lru_cache(maxsize=1024)
+def _provider_segment(providers: Tuple[str, ...]) -> str:
+    """Canonical cache key segment for a list of providers"""
+    return ",".join(sorted(providers))
+
+
+def _glob_escape(text: str) -> str:
+    """Escape Redis glob metacharacters so text matches literally"""
+    return "".join(f"[{c}]" if c in "*?[" else c for c in text)
+
 
 class CacheManager:
     """Manages caching for search results"""
@@ -25,24 +50,53 @@ class CacheManager:
         self,
         redis_url: str = "redis://localhost:6379",
         default_ttl: int = 3600,
-        max_cache_size: int = 10000
+        max_cache_size: int = 10000,
+        max_connections: int = 64,
+        write_queue_size: int = 10000,
+        eviction_sample_size: int = 0
     ):
         self.redis_url = redis_url
         self.default_ttl = default_ttl
         self.max_cache_size = max_cache_size
+        self.max_connections = max_connections
+        self.write_queue_size = write_queue_size
+        # 0 evicts in exact LRU order; otherwise the soonest-expiring of this
+        # many least recently used entries goes first (TTL-driven workloads)
+        self.eviction_sample_size = eviction_sample_size
         self.redis_client: Optional[redis.Redis] = None
-        self.local_cache: Dict[str, Any] = {}
+        # Least recently used first, so eviction pops from the front
+        self.local_cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
+        self._local_inserts = 0
+        # Provider (or custom key) segment -> local cache keys, for invalidation
+        self._local_index: Dict[str, Set[str]] = defaultdict(set)
+        # Cache key -> pending fetch shared by concurrent misses on that key
+        self._inflight: Dict[str, asyncio.Future] = {}
+        # Redis writes queued for the background writer, once initialized
+        self._write_queue: Optional[asyncio.Queue] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._initialized = False
+        self._init_lock = asyncio.Lock()
         self.logger = logger.bind(component="cache")
     
     async def initialize(self):
         """Initialize cache connections"""
+        # Connections are set up once and reused by later callers; the lock
+        # keeps concurrent first callers from each starting a writer
+        async with self._init_lock:
+            if not self._initialized:
+                await self._connect()
+    
+    async def _connect(self):
+        """Connect to Redis and start the background writer"""
         try:
             if redis:
-                self.redis_client = redis.from_url(
+                # A bounded pool lets concurrent requests use separate connections;
+                # cached responses are raw JSON bytes, so responses aren't decoded
+                pool = redis.ConnectionPool.from_url(
                     self.redis_url,
-                    encoding="utf-8",
-                    decode_responses=True
+                    max_connections=self.max_connections
                 )
+                self.redis_client = redis.Redis.from_pool(pool)
                 await self.redis_client.ping()
                 self.logger.info("Redis cache initialized")
             else:
@@ -53,18 +107,26 @@ class CacheManager:
         except Exception as e:
             self.logger.warning(f"Redis connection failed, using mock Redis: {e}")
             self.redis_client = MockRedisAPI()
+        
+        # Redis writes leave the request path and are pipelined in the background
+        self._write_queue = asyncio.Queue(maxsize=self.write_queue_size)
+        self._writer_task = asyncio.create_task(self._writer_loop())
+        
+        self._initialized = True
     
     async def get(
         self,
-        request: Union[SearchRequest, VectorSearchRequest]
+        request: Union[SearchRequest, VectorSearchRequest],
+        cache_key: Optional[str] = None
     ) -> Optional[SearchResponse]:
-        """Get cached response for request"""
-        cache_key = self._generate_cache_key(request)
-        
+        """Get cached response for request, under cache_key if already computed"""
         # Check if caching is enabled
         if request.options and request.options.cache and not request.options.cache.enabled:
             return None
         
+        if cache_key is None:
+            cache_key = self._generate_cache_key(request)
+        
         # Try Redis first
         if self.redis_client:
             try:
@@ -76,77 +138,238 @@ class CacheManager:
                 self.logger.error(f"Redis get error: {e}")
         
         # Fall back to local cache
-        if cache_key in self.local_cache:
-            entry = self.local_cache[cache_key]
-            if entry["expires_at"] > datetime.now():
-                self.logger.debug(f"Local cache hit: {cache_key}")
-                return entry["data"]
-            else:
-                # Remove expired entry
-                del self.local_cache[cache_key]
-        
-        return None
+        return self._get_local(cache_key)
     
-    async def set(
+    async def get_many(
         self,
-        request: Union[SearchRequest, VectorSearchRequest],
-        response: SearchResponse
-    ):
-        """Cache search response"""
-        # Check if caching is enabled
-        if request.options and request.options.cache and not request.options.cache.enabled:
-            return
+        requests: List[Union[SearchRequest, VectorSearchRequest]],
+        cache_keys: Optional[List[str]] = None
+    ) -> List[Optional[SearchResponse]]:
+        """Get cached responses for several requests in one Redis round trip"""
+        responses: List[Optional[SearchResponse]] = [None] * len(requests)
         
-        cache_key = self._generate_cache_key(request)
-        ttl = self.default_ttl
-        
-        if request.options and request.options.cache and request.options.cache.ttl_seconds:
-            ttl = request.options.cache.ttl_seconds
+        # Index of each request with caching enabled -> its cache key
+        keys = {}
+        for i, request in enumerate(requests):
+            if request.options and request.options.cache and not request.options.cache.enabled:
+                continue
+            keys[i] = cache_keys[i] if cache_keys else self._generate_cache_key(request)
+        cache_keys = keys
         
-        # Serialize response
-        serialized = self._serialize_response(response)
+        if not cache_keys:
+            return responses
         
-        # Store in Redis
+        # Try Redis first, with a single MGET for all keys
+        misses = list(cache_keys)
         if self.redis_client:
             try:
-                await self.redis_client.setex(
-                    cache_key,
-                    ttl,
-                    serialized
-                )
-                self.logger.debug(f"Cached in Redis: {cache_key}")
+                cached_values = await self.redis_client.mget(list(cache_keys.values()))
+                misses = []
+                for i, cached_data in zip(cache_keys, cached_values):
+                    if cached_data:
+                        responses[i] = self._deserialize_response(cached_data)
+                    else:
+                        misses.append(i)
+                self.logger.debug(f"Redis cache hits: {len(cache_keys) - len(misses)}/{len(cache_keys)}")
             except Exception as e:
-                self.logger.error(f"Redis set error: {e}")
+                self.logger.error(f"Redis mget error: {e}")
+        
+        # Fall back to local cache for the misses only
+        for i in misses:
+            responses[i] = self._get_local(cache_keys[i])
+        
+        return responses
+    
+    async def get_or_set(
+        self,
+        request: Union[SearchRequest, VectorSearchRequest],
+        fetch: Callable[[], Awaitable[SearchResponse]]
+    ) -> SearchResponse:
+        """Get cached response, or fetch and cache it once for all concurrent misses"""
+        cache_key = self._generate_cache_key(request)
+        cached = await self.get(request, cache_key)
+        if cached is not None:
+            return cached
+        
+        pending = self._inflight.get(cache_key)
+        if pending is not None:
+            # Shielded so one cancelled waiter doesn't cancel the shared fetch
+            return await asyncio.shield(pending)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = future
+        try:
+            response = await fetch()
+            await self.set(request, response, cache_key)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Mark retrieved so there is no warning when nobody else was waiting
+            future.exception()
+            raise
+        else:
+            future.set_result(response)
+            return response
+        finally:
+            self._inflight.pop(cache_key, None)
+    
+    async def set(
+        self,
+        request: Union[SearchRequest, VectorSearchRequest],
+        response: SearchResponse,
+        cache_key: Optional[str] = None
+    ):
+        """Cache search response, under cache_key if already computed"""
+        await self.set_many([(request, response)], [cache_key] if cache_key else None)
+    
+    async def set_many(
+        self,
+        items: List[Tuple[Union[SearchRequest, VectorSearchRequest], SearchResponse]],
+        cache_keys: Optional[List[str]] = None
+    ):
+        """Cache several responses, pipelining the Redis writes into one round trip"""
+        entries = []
+        for i, (request, response) in enumerate(items):
+            # Check if caching is enabled
+            if request.options and request.options.cache and not request.options.cache.enabled:
+                continue
+            
+            cache_key = cache_keys[i] if cache_keys else self._generate_cache_key(request)
+            ttl = self.default_ttl
+            
+            if request.options and request.options.cache and request.options.cache.ttl_seconds:
+                ttl = request.options.cache.ttl_seconds
+            
+            entries.append((cache_key, ttl, response))
+        
+        if not entries:
+            return
+        
+        # Store in Redis, in the background when the writer is running on this loop
+        if self._writer_on_running_loop():
+            for entry in entries:
+                try:
+                    self._write_queue.put_nowait(entry)
+                except asyncio.QueueFull:
+                    # Shed writes under overload; the local cache still has them
+                    self.logger.warning("Redis write queue full, dropping cache write")
+                    break
+        else:
+            await self._write_redis(entries)
         
         # Store in local cache
-        self.local_cache[cache_key] = {
-            "data": response,
-            "expires_at": datetime.now() + timedelta(seconds=ttl)
-        }
+        # Expiry is a time.monotonic() deadline, immune to wall-clock changes
+        now = time.monotonic()
+        for cache_key, ttl, response in entries:
+            self.local_cache[cache_key] = _CacheEntry(response, now + ttl)
+            self.local_cache.move_to_end(cache_key)
+            self._local_index[self._index_segment(cache_key)].add(cache_key)
+            
+            # Sweep out expired entries every 1024 inserts rather than on every overflow
+            self._local_inserts += 1
+            if not self._local_inserts & 1023:
+                self._purge_expired_local()
         
         # Evict old entries if cache is too large
         if len(self.local_cache) > self.max_cache_size:
             self._evict_local_cache()
     
+    async def _write_redis(self, entries: List[Tuple[str, int, SearchResponse]]):
+        """Pipeline SETEX for (cache_key, ttl, response) entries in one round trip"""
+        if not self.redis_client:
+            return
+        
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for cache_key, ttl, response in entries:
+                    pipe.setex(cache_key, ttl, self._serialize_response(response))
+                await pipe.execute()
+            self.logger.debug(f"Cached {len(entries)} responses in Redis")
+        except Exception as e:
+            self.logger.error(f"Redis set error: {e}")
+    
+    def _writer_on_running_loop(self) -> bool:
+        """Whether the writer task is alive and bound to the running event loop"""
+        return (
+            self._writer_task is not None
+            and not self._writer_task.done()
+            and self._writer_task.get_loop() is asyncio.get_running_loop()
+        )
+    
+    async def _flush_writes(self):
+        """Wait for queued Redis writes, writing them directly off the writer's loop"""
+        if self._writer_on_running_loop():
+            await self._write_queue.join()
+        elif self._write_queue is not None and not self._write_queue.empty():
+            entries = []
+            while not self._write_queue.empty():
+                entries.append(self._write_queue.get_nowait())
+                self._write_queue.task_done()
+            await self._write_redis(entries)
+    
+    async def _writer_loop(self, max_batch: int = 128, linger: float = 0.005):
+        """Drain queued writes into Redis, batching whatever arrives together"""
+        queue = self._write_queue
+        while True:
+            batch = [await queue.get()]
+            
+            # Give concurrent requests a moment to add to the same pipeline
+            await asyncio.sleep(linger)
+            while len(batch) < max_batch and not queue.empty():
+                batch.append(queue.get_nowait())
+            
+            try:
+                await self._write_redis(batch)
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    def _get_local(self, cache_key: str) -> Optional[SearchResponse]:
+        """Get an unexpired response from the local cache"""
+        entry = self.local_cache.get(cache_key)
+        if entry is not None:
+            data, expires_at = entry
+            if expires_at > time.monotonic():
+                self.logger.debug(f"Local cache hit: {cache_key}")
+                self.local_cache.move_to_end(cache_key)
+                return data
+            else:
+                # Remove expired entry
+                del self.local_cache[cache_key]
+                self._unindex(cache_key)
+        
+        return None
+    
     async def invalidate(self, pattern: Optional[str] = None):
         """Invalidate cache entries"""
+        # Queued writes must land first, or they would re-add invalidated keys
+        await self._flush_writes()
+        
         if pattern:
             # Invalidate by pattern
             if self.redis_client:
                 try:
-                    keys = await self.redis_client.keys(f"uir:*{pattern}*")
-                    if keys:
-                        await self.redis_client.delete(*keys)
+                    # SCAN in batches instead of KEYS, which blocks the server
+                    # Match only the segment the local index uses, never the digest
+                    glob = _glob_escape(pattern)
+                    for match in (f"uir:v1:*{glob}*:*", f"uir:custom:*{glob}*"):
+                        batch = []
+                        async for key in self.redis_client.scan_iter(match=match, count=500):
+                            batch.append(key)
+                            if len(batch) >= 500:
+                                await self.redis_client.delete(*batch)
+                                batch = []
+                        if batch:
+                            await self.redis_client.delete(*batch)
                 except Exception as e:
                     self.logger.error(f"Redis invalidation error: {e}")
             
-            # Invalidate local cache
-            keys_to_remove = [
-                k for k in self.local_cache.keys()
-                if pattern in k
-            ]
-            for key in keys_to_remove:
-                del self.local_cache[key]
+            # Invalidate local cache through the segment index
+            for segment in [seg for seg in self._local_index if pattern in seg]:
+                for key in self._local_index.pop(segment):
+                    self.local_cache.pop(key, None)
         else:
             # Clear all cache
             if self.redis_client:
@@ -156,6 +379,28 @@ class CacheManager:
                     self.logger.error(f"Redis flush error: {e}")
             
             self.local_cache.clear()
+            self._local_index.clear()
+    
+    @staticmethod
+    def _index_segment(cache_key: str) -> str:
+        """Get the provider segment of a cache key, or the whole custom key"""
+        if cache_key.startswith("uir:custom:"):
+            return cache_key.split(":", 2)[2]
+        parts = cache_key.split(":", 3)
+        return parts[2] if len(parts) > 2 else cache_key
+    
+    def _unindex(self, cache_key: str):
+        """Drop a key evicted from the local cache from the segment index"""
+        segment = self._index_segment(cache_key)
+        keys = self._local_index.get(segment)
+        if keys is not None:
+            keys.discard(cache_key)
+            if not keys:
+                del self._local_index[segment]
+    
+    def cache_key(self, request: Union[SearchRequest, VectorSearchRequest]) -> str:
+        """Cache key for a request; callers that both get and set compute it once"""
+        return self._generate_cache_key(request)
     
     def _generate_cache_key(
         self,
@@ -166,70 +411,83 @@ class CacheManager:
         if request.options and request.options.cache and request.options.cache.key:
             return f"uir:custom:{request.options.cache.key}"
         
-        # Generate key from request parameters
-        key_parts = []
-        
-        # Add provider(s)
+        # Provider segment stays readable so invalidation can match on it
         if isinstance(request.provider, list):
-            key_parts.append(",".join(sorted(request.provider)))
+            providers = _provider_segment(tuple(request.provider))
         else:
-            key_parts.append(request.provider)
+            providers = request.provider
         
-        # Add query or vector hash
+        # Everything else goes into one digest, each part tagged and
+        # length-prefixed so different splits can't produce the same input
+        hasher = hashlib.blake2b(digest_size=16)
+        
+        def feed(tag: bytes, data: bytes):
+            hasher.update(tag + len(data).to_bytes(8, "little"))
+            hasher.update(data)
+        
+        # Add query or vector
         if isinstance(request, SearchRequest):
-            key_parts.append(hashlib.md5(request.query.encode()).hexdigest())
+            feed(b"q", request.query.encode())
         elif isinstance(request, VectorSearchRequest):
             if request.text:
-                key_parts.append(hashlib.md5(request.text.encode()).hexdigest())
+                feed(b"t", request.text.encode())
             elif request.vector:
-                vector_str = ",".join(map(str, request.vector[:10]))  # Use first 10 dims
-                key_parts.append(hashlib.md5(vector_str.encode()).hexdigest())
+                # Raw float64 bytes of the first 10 dims; no per-float str formatting
+                head = request.vector[:10]
+                feed(b"v", struct.pack(f"<{len(head)}d", *head))
         
-        # Add options hash
+        # Add options; orjson sorts keys (including nested filters) and
+        # emits bytes directly, without an intermediate str
         if request.options:
-            options_str = json.dumps(
+            feed(b"o", orjson.dumps(
                 request.options.model_dump(),
-                sort_keys=True,
+                option=orjson.OPT_SORT_KEYS,
                 default=str
-            )
-            key_parts.append(hashlib.md5(options_str.encode()).hexdigest()[:8])
+            ))
         
-        return f"uir:v1:{':'.join(key_parts)}"
+        return f"uir:v1:{providers}:{hasher.hexdigest()}"
     
-    def _serialize_response(self, response: SearchResponse) -> str:
+    def _serialize_response(self, response: SearchResponse) -> bytes:
         """Serialize response for caching"""
-        return json.dumps(
-            response.model_dump(),
-            default=str
-        )
+        return _RESP_ADAPTER.dump_json(response)
     
-    def _deserialize_response(self, data: str) -> SearchResponse:
+    def _deserialize_response(self, data: Union[bytes, str]) -> SearchResponse:
         """Deserialize cached response"""
-        return SearchResponse(**json.loads(data))
+        # Validate straight from JSON, without building an intermediate dict
+        return _RESP_ADAPTER.validate_json(data)
     
     def _evict_local_cache(self):
-        """Evict oldest entries from local cache"""
-        # Remove expired entries first
-        now = datetime.now()
+        """Evict least recently used entries from local cache"""
+        if self.eviction_sample_size:
+            self._evict_sampled(self.eviction_sample_size)
+            return
+        
+        while len(self.local_cache) > self.max_cache_size:
+            key, _ = self.local_cache.popitem(last=False)
+            self._unindex(key)
+    
+    def _evict_sampled(self, k: int):
+        """Evict the soonest-expiring of the k least recently used entries until under size"""
+        # Sampling the LRU end is O(k) per eviction; a random sample would
+        # first need a full copy of the keys
+        while len(self.local_cache) > self.max_cache_size:
+            victim = min(
+                islice(self.local_cache.items(), k),
+                key=lambda item: item[1].expires_at
+            )[0]
+            del self.local_cache[victim]
+            self._unindex(victim)
+    
+    def _purge_expired_local(self):
+        """Remove expired entries from local cache"""
+        now = time.monotonic()
         expired_keys = [
-            k for k, v in self.local_cache.items()
-            if v["expires_at"] <= now
+            k for k, entry in self.local_cache.items()
+            if entry.expires_at <= now
         ]
         for key in expired_keys:
             del self.local_cache[key]
-        
-        # If still too large, remove oldest entries
-        if len(self.local_cache) > self.max_cache_size:
-            # Sort by expiration time and remove oldest
-            sorted_items = sorted(
-                self.local_cache.items(),
-                key=lambda x: x[1]["expires_at"]
-            )
-            
-            # Remove 20% of oldest entries
-            num_to_remove = len(self.local_cache) // 5
-            for key, _ in sorted_items[:num_to_remove]:
-                del self.local_cache[key]
+            self._unindex(key)
     
     async def get_stats(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -254,5 +512,13 @@ class CacheManager:
     
     async def close(self):
         """Close cache connections"""
+        # Flush queued writes before the connection goes away
+        if self._writer_task:
+            await self._flush_writes()
+            self._writer_task.cancel()
+            self._writer_task = None
+            self._write_queue = None
+        
         if self.redis_client:
-            await self.redis_client.close()
\ No newline at end of file
+            await self.redis_client.close()
+        self._initialized = False
\ No newline at end of file
@@ -5,6 +5,10 @@ from typing import Dict, List, Any, Optional, Union
 import httpx
 import asyncio
 from dataclasses import dataclass
+try:
+    import h2  # Lets httpx multiplex requests over one HTTP/2 connection
+except ImportError:
+    h2 = None
 
 from .models import (
     SearchRequest,
@@ -30,6 +34,10 @@ class UIRConfig:
     default_provider: Optional[str] = None
 
 
+# Connection pool bounds shared by the sync and async clients
+_POOL_LIMITS = httpx.Limits(max_connections=100, max_keepalive_connections=50)
+
+
 class UIR:
     """Universal Information Retrieval client"""
     
@@ -58,17 +66,27 @@ class UIR:
                 provider_keys=provider_keys or {}
             )
         
-        self.client = httpx.Client(
-            base_url=self.config.base_url,
-            timeout=self.config.timeout,
-            headers=self._get_headers()
-        )
+        self.client = httpx.Client(**self._client_options())
         
-        self.async_client = httpx.AsyncClient(
-            base_url=self.config.base_url,
-            timeout=self.config.timeout,
-            headers=self._get_headers()
-        )
+        # Created on first async use; many callers only use the sync API
+        self._async_client: Optional[httpx.AsyncClient] = None
+    
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """Async HTTP client, created lazily"""
+        if self._async_client is None:
+            self._async_client = httpx.AsyncClient(**self._client_options())
+        return self._async_client
+    
+    def _client_options(self) -> Dict[str, Any]:
+        """Get keyword arguments shared by the sync and async HTTP clients"""
+        return {
+            "base_url": self.config.base_url,
+            "timeout": self.config.timeout,
+            "headers": self._get_headers(),
+            "http2": h2 is not None,
+            "limits": _POOL_LIMITS
+        }
     
     def _get_headers(self) -> Dict[str, str]:
         """Get request headers"""
@@ -124,7 +142,7 @@ class UIR:
         
         response = self.client.post(
             "/search",
-            json=request.model_dump()
+            content=request.model_dump_json()
         )
         response.raise_for_status()
         
@@ -145,7 +163,7 @@ class UIR:
         
         response = await self.async_client.post(
             "/search",
-            json=request.model_dump()
+            content=request.model_dump_json()
         )
         response.raise_for_status()
         
@@ -190,7 +208,7 @@ class UIR:
         
         response = self.client.post(
             "/vector/search",
-            json=request.model_dump()
+            content=request.model_dump_json()
         )
         response.raise_for_status()
         
@@ -228,7 +246,7 @@ class UIR:
         
         response = self.client.post(
             "/hybrid/search",
-            json=request.model_dump()
+            content=request.model_dump_json()
         )
         response.raise_for_status()
         
@@ -317,7 +335,7 @@ class UIR:
         
         response = self.client.post(
             "/documents/index",
-            json=request.model_dump()
+            content=request.model_dump_json()
         )
         response.raise_for_status()
         
@@ -355,6 +373,25 @@ class UIR:
         results = response.json()["results"]
         return [SearchResponse(**r) for r in results]
     
+    async def batch_search_async(
+        self,
+        queries: List[Dict[str, Any]],
+        **kwargs
+    ) -> List[SearchResponse]:
+        """
+        Perform multiple searches concurrently from the client
+        
+        Args:
+            queries: List of search queries (provider, query and search options)
+            **kwargs: Additional options applied to every query
+        
+        Returns:
+            List of SearchResponse objects, in query order
+        """
+        return list(await asyncio.gather(
+            *(self.search_async(**{**kwargs, **query}) for query in queries)
+        ))
+    
     def search_stream(
         self,
         provider: Union[str, List[str]],
@@ -381,7 +418,7 @@ class UIR:
         with self.client.stream(
             "POST",
             "/search/stream",
-            json=request.model_dump()
+            content=request.model_dump_json()
         ) as response:
             for line in response.iter_lines():
                 if line:
@@ -415,10 +452,15 @@ class UIR:
         return response.json()
     
     def close(self):
-        """Close client connections"""
+        """Close the sync client connections"""
+        self.client.close()
+    
+    async def aclose(self):
+        """Close client connections, including the async client if it was used"""
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
         self.client.close()
-        if hasattr(self, "async_client"):
-            asyncio.run(self.async_client.aclose())
     
     def __enter__(self):
         """Context manager entry"""
@@ -434,4 +476,4 @@ class UIR:
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
         """Async context manager exit"""
-        await self.async_client.aclose()
\ No newline at end of file
+        await self.aclose()
\ No newline at end of file
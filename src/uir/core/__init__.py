@@ -1,7 +1,7 @@
 """Core components of UIR framework"""
 
 from .adapter import ProviderAdapter
-from .circuit_breaker import CircuitBreaker
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 from .rate_limiter import RateLimiter
 
-__all__ = ["ProviderAdapter", "CircuitBreaker", "RateLimiter"]
\ No newline at end of file
+__all__ = ["ProviderAdapter", "CircuitBreaker", "CircuitOpenError", "RateLimiter"]
\ No newline at end of file
@@ -4,7 +4,11 @@ from abc import ABC, abstractmethod
 from typing import Dict, List, Any, Optional
 import asyncio
 import httpx
-from tenacity import retry, stop_after_attempt, wait_exponential
+try:
+    import h2  # Lets httpx multiplex requests over one HTTP/2 connection
+except ImportError:
+    h2 = None
+from tenacity import retry, retry_if_not_exception_type, stop_after_attempt, wait_exponential
 import structlog
 
 from ..models import (
@@ -14,20 +18,26 @@ from ..models import (
     ResponseMetadata,
     ProviderHealth
 )
-from .circuit_breaker import CircuitBreaker
+from .circuit_breaker import CircuitBreaker, CircuitOpenError
 from .rate_limiter import RateLimiter
 
 logger = structlog.get_logger()
 
+# Connection pool bounds for the client shared by all provider adapters
+_SHARED_POOL_LIMITS = httpx.Limits(max_connections=200, max_keepalive_connections=100)
+
 
 class ProviderAdapter(ABC):
     """Base class for all provider adapters"""
     
-    def __init__(self, config: ProviderConfig):
+    def __init__(self, config: ProviderConfig, client: Optional[httpx.AsyncClient] = None):
         self.config = config
         self.name = config.name
         self.type = config.type
-        self.client = httpx.AsyncClient(timeout=config.timeout_ms / 1000)
+        self.timeout = config.timeout_ms / 1000
+        # A client passed in is shared with other adapters and owned by the caller
+        self._owns_client = client is None
+        self.client = client or httpx.AsyncClient(timeout=self.timeout)
         self.circuit_breaker = CircuitBreaker(
             failure_threshold=config.circuit_breaker_config.get("failure_threshold", 5),
             recovery_timeout=config.circuit_breaker_config.get("recovery_timeout", 60),
@@ -36,6 +46,10 @@ class ProviderAdapter(ABC):
         self.rate_limiter = RateLimiter(
             rate_limits=config.rate_limits
         ) if config.rate_limits else None
+        # Bound once: every request draws from the "default" operation
+        self._acquire_rate_limit = (
+            self.rate_limiter.acquirer("default") if self.rate_limiter else None
+        )
         self.logger = logger.bind(provider=self.name)
     
     @abstractmethod
@@ -82,7 +96,9 @@ class ProviderAdapter(ABC):
     
     @retry(
         stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=2, max=10)
+        wait=wait_exponential(multiplier=1, min=2, max=10),
+        # Retrying against an open breaker only adds backoff latency
+        retry=retry_if_not_exception_type(CircuitOpenError)
     )
     async def _execute_request(
         self,
@@ -92,9 +108,13 @@ class ProviderAdapter(ABC):
     ) -> Dict[str, Any]:
         """Execute HTTP request with retry logic"""
         try:
+            # Reject before waiting on the rate limiter if the circuit is open
+            if self.circuit_breaker and self.circuit_breaker.is_open():
+                raise CircuitOpenError("Circuit breaker is open")
+            
             # Apply rate limiting if configured
-            if self.rate_limiter:
-                await self.rate_limiter.acquire()
+            if self._acquire_rate_limit:
+                await self._acquire_rate_limit()
             
             # Apply circuit breaker if configured
             if self.circuit_breaker:
@@ -123,6 +143,7 @@ class ProviderAdapter(ABC):
         **kwargs
     ) -> Dict[str, Any]:
         """Make HTTP request to provider"""
+        kwargs.setdefault("timeout", self.timeout)
         response = await self.client.request(
             method=method,
             url=endpoint,
@@ -139,13 +160,15 @@ class ProviderAdapter(ABC):
     
     async def close(self):
         """Clean up resources"""
-        await self.client.aclose()
+        if self._owns_client:
+            await self.client.aclose()
 
 
 class ProviderFactory:
     """Factory for creating provider adapters"""
     
     _providers: Dict[str, type] = {}
+    _shared_client: Optional[httpx.AsyncClient] = None
     
     @classmethod
     def register(cls, name: str, adapter_class: type):
@@ -153,9 +176,30 @@ class ProviderFactory:
         cls._providers[name] = adapter_class
     
     @classmethod
-    def create(cls, config: ProviderConfig) -> ProviderAdapter:
+    def get_shared_client(cls) -> httpx.AsyncClient:
+        """Get the HTTP client shared by adapters, creating it on first use"""
+        if cls._shared_client is None:
+            cls._shared_client = httpx.AsyncClient(
+                http2=h2 is not None,
+                limits=_SHARED_POOL_LIMITS
+            )
+        return cls._shared_client
+    
+    @classmethod
+    def create(
+        cls,
+        config: ProviderConfig,
+        shared_client: Optional[httpx.AsyncClient] = None
+    ) -> ProviderAdapter:
         """Create a provider adapter instance"""
         adapter_class = cls._providers.get(config.name)
         if not adapter_class:
             raise ValueError(f"Unknown provider: {config.name}")
-        return adapter_class(config)
\ No newline at end of file
+        return adapter_class(config, client=shared_client or cls.get_shared_client())
+    
+    @classmethod
+    async def close(cls):
+        """Close the shared HTTP client"""
+        if cls._shared_client is not None:
+            await cls._shared_client.aclose()
+            cls._shared_client = None
\ No newline at end of file
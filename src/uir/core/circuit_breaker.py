@@ -1,7 +1,6 @@
 """Circuit breaker implementation for fault tolerance"""
 
-import asyncio
-from datetime import datetime, timedelta
+import time
 from enum import Enum
 from typing import Callable, Any, Optional
 import structlog
@@ -16,6 +15,11 @@ class CircuitState(Enum):
     HALF_OPEN = "half_open"
 
 
+class CircuitOpenError(Exception):
+    """Raised when a call is rejected because the circuit is open"""
+    pass
+
+
 class CircuitBreaker:
     """Circuit breaker for fault tolerance"""
     
@@ -31,64 +35,80 @@ class CircuitBreaker:
         self.expected_exception = expected_exception
         self.half_open_max_calls = half_open_max_calls
         
+        # No lock: state only changes between awaits, so each update below runs
+        # without interleaving on the event loop
         self.failure_count = 0
-        self.last_failure_time: Optional[datetime] = None
+        self.last_failure_ns: Optional[int] = None  # time.monotonic_ns()
         self.state = CircuitState.CLOSED
         self.half_open_calls = 0
-        self._lock = asyncio.Lock()
     
     async def call(self, func: Callable, *args, **kwargs) -> Any:
         """Execute function with circuit breaker protection"""
-        async with self._lock:
-            if self.state == CircuitState.OPEN:
-                if await self._should_attempt_reset():
-                    self.state = CircuitState.HALF_OPEN
-                    self.half_open_calls = 0
-                else:
-                    raise Exception(f"Circuit breaker is open")
+        if not self._admit():
+            raise CircuitOpenError("Circuit breaker is open")
         
         try:
             result = await func(*args, **kwargs)
-            await self._on_success()
-            return result
         except self.expected_exception as e:
-            await self._on_failure()
+            self._on_failure()
             raise e
+        self._on_success()
+        return result
+    
+    def _admit(self) -> bool:
+        """Decide whether a call may proceed, moving OPEN to HALF_OPEN if due"""
+        if self.state is not CircuitState.OPEN:
+            return True
+        if not self._should_attempt_reset():
+            return False
+        self.state = CircuitState.HALF_OPEN
+        self.half_open_calls = 0
+        return True
     
-    async def _should_attempt_reset(self) -> bool:
+    def _cas_state(self, expected: CircuitState, new: CircuitState) -> bool:
+        """Move to a new state only if still in the expected one"""
+        if self.state is not expected:
+            return False
+        self.state = new
+        return True
+    
+    def _should_attempt_reset(self) -> bool:
         """Check if circuit should attempt reset"""
-        if self.last_failure_time is None:
+        if self.last_failure_ns is None:
             return False
-        return datetime.now() >= self.last_failure_time + timedelta(seconds=self.recovery_timeout)
+        return time.monotonic_ns() - self.last_failure_ns >= self.recovery_timeout * 1_000_000_000
     
-    async def _on_success(self):
+    def is_open(self) -> bool:
+        """Check whether calls would currently be rejected"""
+        return self.state is CircuitState.OPEN and not self._should_attempt_reset()
+    
+    def _on_success(self):
         """Handle successful call"""
-        async with self._lock:
-            if self.state == CircuitState.HALF_OPEN:
-                self.half_open_calls += 1
-                if self.half_open_calls >= self.half_open_max_calls:
-                    self.state = CircuitState.CLOSED
+        if self.state is CircuitState.HALF_OPEN:
+            self.half_open_calls += 1
+            if self.half_open_calls >= self.half_open_max_calls:
+                if self._cas_state(CircuitState.HALF_OPEN, CircuitState.CLOSED):
                     self.failure_count = 0
                     logger.info("Circuit breaker closed")
-            else:
-                self.failure_count = 0
+        else:
+            self.failure_count = 0
     
-    async def _on_failure(self):
+    def _on_failure(self):
         """Handle failed call"""
-        async with self._lock:
-            self.failure_count += 1
-            self.last_failure_time = datetime.now()
-            
-            if self.state == CircuitState.HALF_OPEN:
-                self.state = CircuitState.OPEN
-                logger.warning("Circuit breaker opened from half-open state")
-            elif self.failure_count >= self.failure_threshold:
-                self.state = CircuitState.OPEN
-                logger.warning(
-                    "Circuit breaker opened",
-                    failures=self.failure_count,
-                    threshold=self.failure_threshold
-                )
+        self.failure_count += 1
+        self.last_failure_ns = time.monotonic_ns()
+        
+        if self._cas_state(CircuitState.HALF_OPEN, CircuitState.OPEN):
+            logger.warning("Circuit breaker opened from half-open state")
+        elif (
+            self.failure_count >= self.failure_threshold
+            and self._cas_state(CircuitState.CLOSED, CircuitState.OPEN)
+        ):
+            logger.warning(
+                "Circuit breaker opened",
+                failures=self.failure_count,
+                threshold=self.failure_threshold
+            )
     
     def get_state(self) -> CircuitState:
         """Get current circuit state"""
@@ -97,6 +117,6 @@ class CircuitBreaker:
     def reset(self):
         """Manually reset the circuit breaker"""
         self.failure_count = 0
-        self.last_failure_time = None
+        self.last_failure_ns = None
         self.state = CircuitState.CLOSED
         self.half_open_calls = 0
\ No newline at end of file
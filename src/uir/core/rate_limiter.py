@@ -1,9 +1,11 @@
 """Rate limiter implementation"""
 
 import asyncio
+import threading
 import time
-from typing import Dict, Optional
-from collections import deque
+from functools import partial
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional, Tuple
+from itertools import cycle
 import structlog
 
 logger = structlog.get_logger()
@@ -12,31 +14,102 @@ logger = structlog.get_logger()
 class RateLimiter:
     """Token bucket rate limiter"""
     
-    def __init__(self, rate_limits: Dict[str, int]):
+    def __init__(self, rate_limits: Dict[str, int], shards: int = 1):
         """
         Initialize rate limiter
         
         Args:
             rate_limits: Dict of operation -> requests per second
+            shards: Sub-buckets per operation, each with an equal share of
+                the limit (at most one shard per request), so independent
+                callers don't share one bucket
         """
         self.rate_limits = rate_limits
-        self.buckets: Dict[str, TokenBucket] = {}
+        self.shards: Dict[str, List[TokenBucket]] = {}
+        self._round_robin: Dict[str, Iterator[TokenBucket]] = {}
         
         for operation, limit in rate_limits.items():
-            self.buckets[operation] = TokenBucket(
-                capacity=limit,
-                refill_rate=limit
-            )
+            # Spread the remainder too, so the shards add up to exactly the limit
+            count = max(1, min(shards, limit))
+            share, remainder = divmod(limit, count)
+            self.shards[operation] = [
+                TokenBucket(
+                    capacity=max(1, share + (i < remainder)),
+                    refill_rate=share + (i < remainder)
+                )
+                for i in range(count)
+            ]
+            self._round_robin[operation] = cycle(self.shards[operation])
+        
+        # First (with one shard, the only) bucket per operation
+        self.buckets: Dict[str, TokenBucket] = {
+            operation: buckets[0] for operation, buckets in self.shards.items()
+        }
+        
+        # Operation -> (shards, round-robin), falling back to "default"; filled
+        # on first use so later checks are a single dict probe
+        self._resolved: Dict[str, Tuple[List[TokenBucket], Iterator[TokenBucket]]] = {}
+        
+        # acquire_<operation> per configured operation, for callers that know
+        # their operation up front and want to skip the lookup altogether
+        for operation in rate_limits:
+            if operation.isidentifier():
+                setattr(self, f"acquire_{operation}", self.acquirer(operation))
+    
+    def _resolve(self, operation: str) -> Optional[Tuple[List["TokenBucket"], Iterator["TokenBucket"]]]:
+        """Look up and remember the shards serving an operation"""
+        name = operation if operation in self.shards else "default"
+        if name not in self.shards:
+            return None
+        resolved = self._resolved[operation] = (self.shards[name], self._round_robin[name])
+        return resolved
+    
+    @staticmethod
+    def _pick(buckets: List["TokenBucket"], round_robin: Iterator["TokenBucket"], key: Any) -> "TokenBucket":
+        """Pick one of an operation's shards, by caller key or round-robin"""
+        if len(buckets) == 1:
+            return buckets[0]
+        if key is None:
+            return next(round_robin)
+        return buckets[hash(key) % len(buckets)]
+    
+    def _select_bucket(self, operation: str, key: Any = None) -> Optional["TokenBucket"]:
+        """Pick the bucket for an operation, by caller key or round-robin"""
+        try:
+            buckets, round_robin = self._resolved[operation]
+        except KeyError:
+            resolved = self._resolve(operation)
+            if resolved is None:
+                return None
+            buckets, round_robin = resolved
+        return self._pick(buckets, round_robin, key)
+    
+    async def _acquire_from(
+        self,
+        buckets: List["TokenBucket"],
+        round_robin: Iterator["TokenBucket"],
+        tokens: int = 1,
+        key: Any = None
+    ):
+        """Acquire tokens from shards resolved ahead of time"""
+        await self._pick(buckets, round_robin, key).acquire(tokens)
     
-    async def acquire(self, operation: str = "default", tokens: int = 1):
+    def acquirer(self, operation: str) -> Callable[..., Awaitable[None]]:
+        """Get an acquire(tokens=1, key=None) bound to one operation's buckets"""
+        resolved = self._resolve(operation)
+        if resolved is None:
+            return partial(self.acquire, operation)
+        return partial(self._acquire_from, *resolved)
+    
+    async def acquire(self, operation: str = "default", tokens: int = 1, key: Any = None):
         """Acquire tokens for an operation"""
-        bucket = self.buckets.get(operation, self.buckets.get("default"))
+        bucket = self._select_bucket(operation, key)
         if bucket:
             await bucket.acquire(tokens)
     
-    def try_acquire(self, operation: str = "default", tokens: int = 1) -> bool:
+    def try_acquire(self, operation: str = "default", tokens: int = 1, key: Any = None) -> bool:
         """Try to acquire tokens without blocking"""
-        bucket = self.buckets.get(operation, self.buckets.get("default"))
+        bucket = self._select_bucket(operation, key)
         if bucket:
             return bucket.try_acquire(tokens)
         return True
@@ -50,20 +123,14 @@ class TokenBucket:
         self.refill_rate = refill_rate
         self.tokens = capacity
         self.last_refill = time.time()
-        self._lock = None
+        # The critical section never awaits, so a plain lock is enough and is
+        # much cheaper than an asyncio.Lock; it also covers sync callers on threads
+        self._lock = threading.Lock()
     
     async def acquire(self, tokens: int = 1):
         """Acquire tokens, blocking if necessary"""
-        if self._lock is None:
-            self._lock = asyncio.Lock()
-            
-        while True:
-            async with self._lock:
-                self._refill()
-                if self.tokens >= tokens:
-                    self.tokens -= tokens
-                    return
-            
+        # Try first; only callers that find the bucket empty touch the scheduler
+        while not self.try_acquire(tokens):
             # Calculate wait time
             tokens_needed = tokens - self.tokens
             wait_time = tokens_needed / self.refill_rate
@@ -71,11 +138,15 @@ class TokenBucket:
     
     def try_acquire(self, tokens: int = 1) -> bool:
         """Try to acquire tokens without blocking"""
-        self._refill()
-        if self.tokens >= tokens:
-            self.tokens -= tokens
-            return True
-        return False
+        if tokens > self.capacity:
+            # The bucket never holds that many, so waiting would never end
+            raise ValueError(f"Cannot acquire {tokens} tokens from a bucket of capacity {self.capacity}")
+        with self._lock:
+            self._refill()
+            if self.tokens >= tokens:
+                self.tokens -= tokens
+                return True
+            return False
     
     def _refill(self):
         """Refill tokens based on elapsed time"""
@@ -92,41 +163,53 @@ class SlidingWindowRateLimiter:
     def __init__(self, max_requests: int, window_seconds: int):
         self.max_requests = max_requests
         self.window_seconds = window_seconds
-        self.requests = deque()
+        # Two fixed-window counters; the previous window's count is weighted by
+        # how much of it still overlaps the sliding window, so memory and work
+        # per request stay constant however high the rate
+        self.previous_count = 0
+        self.current_count = 0
+        self.window_start = time.monotonic()
         self._lock = asyncio.Lock()
     
     async def acquire(self):
         """Acquire permission to make a request"""
-        async with self._lock:
-            now = time.time()
-            
-            # Remove old requests outside the window
-            while self.requests and self.requests[0] < now - self.window_seconds:
-                self.requests.popleft()
-            
-            # Check if we can make a request
-            if len(self.requests) < self.max_requests:
-                self.requests.append(now)
-                return
-            
-            # Calculate wait time
-            oldest = self.requests[0]
-            wait_time = (oldest + self.window_seconds) - now
+        # Retry in a loop rather than recursing, so waiting callers don't stack frames
+        while True:
+            async with self._lock:
+                wait_time = self._admit(time.monotonic())
+                if wait_time is None:
+                    return
             
-        await asyncio.sleep(wait_time)
-        await self.acquire()  # Retry
+            # Never sleep longer than a window; the next attempt recomputes
+            await asyncio.sleep(min(max(wait_time, 0), self.window_seconds))
     
     def try_acquire(self) -> bool:
         """Try to acquire without blocking"""
-        now = time.time()
-        
-        # Remove old requests
-        while self.requests and self.requests[0] < now - self.window_seconds:
-            self.requests.popleft()
-        
-        # Check if we can make a request
-        if len(self.requests) < self.max_requests:
-            self.requests.append(now)
-            return True
+        return self._admit(time.monotonic()) is None
+    
+    def _roll(self, now: float):
+        """Advance the fixed windows so the current one contains now"""
+        elapsed = now - self.window_start
+        if elapsed >= self.window_seconds:
+            windows = int(elapsed // self.window_seconds)
+            # After a whole idle window nothing overlaps any more
+            self.previous_count = self.current_count if windows == 1 else 0
+            self.current_count = 0
+            self.window_start += windows * self.window_seconds
+    
+    def _admit(self, now: float) -> Optional[float]:
+        """Count the request and return None if allowed, otherwise the time to wait"""
+        self._roll(now)
+        elapsed = now - self.window_start
+        weight = 1 - elapsed / self.window_seconds
+        if self.previous_count * weight + self.current_count < self.max_requests:
+            self.current_count += 1
+            return None
         
-        return False
\ No newline at end of file
+        # Calculate wait time
+        if self.current_count >= self.max_requests:
+            # Full on its own; wait for the next window
+            return self.window_start + self.window_seconds - now
+        # Wait until enough of the previous window has slid out
+        needed_weight = (self.max_requests - self.current_count) / self.previous_count
+        return self.window_start + self.window_seconds * (1 - needed_weight) - now
\ No newline at end of file
@@ -1,12 +1,141 @@
 """Mock database for testing without PostgreSQL"""
 
 from typing import Dict, List, Any, Optional
+from collections import Counter
+from dataclasses import dataclass
 from datetime import datetime
 import asyncio
+import copy
 import json
 import uuid
 
 
+class _Row:
+    """Fixed-field table row; keys without a field go to extras"""
+    # Subclasses list their fields in __slots__, in order, ending with "extras"
+    __slots__ = ()
+    
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "_Row":
+        """Build a row from a free-form record, missing fields as None"""
+        extras = dict(data)
+        values = [extras.pop(name, None) for name in cls.__slots__[:-1]]
+        return cls(*values, extras or None)
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Flatten the row back into a free-form record"""
+        data = {name: getattr(self, name) for name in self.__slots__[:-1]}
+        if self.extras:
+            data.update(self.extras)
+        return data
+    
+    def update(self, updates: Dict[str, Any]):
+        """Apply updates to fields, or to extras for unknown keys"""
+        for key, value in updates.items():
+            if key != "extras" and key in self.__slots__:
+                setattr(self, key, value)
+            else:
+                if self.extras is None:
+                    self.extras = {}
+                self.extras[key] = value
+
+
+@dataclass
+class UserRow(_Row):
+    """Row of the users table"""
+    __slots__ = ("id", "email", "created_at", "updated_at", "extras")
+    id: str
+    email: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    extras: Optional[Dict[str, Any]]
+
+
+@dataclass
+class ProviderRow(_Row):
+    """Row of the providers table"""
+    __slots__ = ("id", "name", "type", "config", "status", "created_at", "updated_at", "extras")
+    id: str
+    name: Optional[str]
+    type: Optional[str]
+    config: Optional[Dict[str, Any]]
+    status: Optional[str]
+    created_at: Optional[datetime]
+    updated_at: Optional[datetime]
+    extras: Optional[Dict[str, Any]]
+
+
+@dataclass
+class ApiKeyRow(_Row):
+    """Row of the api_keys table"""
+    __slots__ = ("id", "key_hash", "user_id", "created_at", "last_used", "usage_count", "extras")
+    id: str
+    key_hash: Optional[str]
+    user_id: Optional[str]
+    created_at: Optional[datetime]
+    last_used: Optional[datetime]
+    usage_count: int
+    extras: Optional[Dict[str, Any]]
+
+
+@dataclass
+class QueryRow(_Row):
+    """Row of the query_history table"""
+    __slots__ = ("id", "user_id", "query", "timestamp", "extras")
+    id: str
+    user_id: Optional[str]
+    query: Optional[str]
+    timestamp: datetime
+    extras: Optional[Dict[str, Any]]
+
+
+# Table -> row type its records are stored as
+_ROW_TYPES = {
+    "users": UserRow,
+    "providers": ProviderRow,
+    "api_keys": ApiKeyRow,
+    "query_history": QueryRow
+}
+
+# Table -> (looked-up field, secondary index name)
+_INDEXED_FIELDS = {
+    "users": ("email", "users_by_email"),
+    "providers": ("name", "providers_by_name"),
+    "api_keys": ("key_hash", "api_keys_by_hash")
+}
+
+
+def _new_usage_counters() -> Dict[str, Any]:
+    """Empty running totals for usage metrics"""
+    return {
+        "total_requests": 0,
+        "total_tokens": 0,
+        "by_provider": Counter(),
+        "by_operation": Counter()
+    }
+
+
+def _count_usage(counters: Dict[str, Any], metric: Dict[str, Any]):
+    """Add one usage metric to running totals"""
+    counters["total_requests"] += 1
+    counters["total_tokens"] += metric.get("tokens_used", 0)
+    counters["by_provider"][metric.get("provider", "unknown")] += 1
+    counters["by_operation"][metric.get("operation", "unknown")] += 1
+
+
+def _count_usage_many(counters: Dict[str, Any], metrics: List[Dict[str, Any]]):
+    """Add a list of usage metrics to running totals in one pass per field"""
+    counters["total_requests"] += len(metrics)
+    counters["total_tokens"] += sum(m.get("tokens_used", 0) for m in metrics)
+    counters["by_provider"].update(m.get("provider", "unknown") for m in metrics)
+    counters["by_operation"].update(m.get("operation", "unknown") for m in metrics)
+
+
+def _as_datetime(value: Any) -> Any:
+    """Parse the ISO string a JSON round trip leaves in place of a datetime"""
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
 class MockDatabase:
     """Mock database that stores data in memory"""
     
@@ -22,6 +151,98 @@ class MockDatabase:
         self.sequences = {
             "usage_metrics_id": 0
         }
+        # Field value -> ids of the records holding it (normally just one), so
+        # lookups by field skip a table scan
+        self.indexes: Dict[str, Dict[Any, Any]] = {
+            index: {} for _, index in _INDEXED_FIELDS.values()
+        }
+        # User id -> query ids in logging order, i.e. oldest timestamp first
+        self.indexes["queries_by_user"] = {}
+        # Usage totals kept up to date by log_usage: overall, per user, and per
+        # hour (with that hour's metrics) for date ranges
+        self.counters = _new_usage_counters()
+        self.user_counters: Dict[Any, Dict[str, Any]] = {}
+        self.hourly: Dict[int, Dict[str, Any]] = {}
+    
+    def _index_record(self, table: str, record: _Row):
+        """Add a record's looked-up field to its table's index"""
+        field, index = _INDEXED_FIELDS[table]
+        value = getattr(record, field)
+        if value is not None:
+            self.indexes[index].setdefault(value, set()).add(record.id)
+    
+    def _unindex_record(self, table: str, record: _Row):
+        """Remove a record's looked-up field from its table's index"""
+        field, index = _INDEXED_FIELDS[table]
+        value = getattr(record, field)
+        ids = self.indexes[index].get(value)
+        if ids is not None:
+            ids.discard(record.id)
+            if not ids:
+                del self.indexes[index][value]
+    
+    def _lookup(self, table: str, value: Any) -> Optional[Dict[str, Any]]:
+        """Get a record by its indexed field"""
+        field, index = _INDEXED_FIELDS[table]
+        ids = self.indexes[index].get(value)
+        if not ids:
+            return None
+        if len(ids) == 1:
+            record = self.tables[table].get(next(iter(ids)))
+        else:
+            # Duplicate values: the first record in table order wins, as a scan would
+            record = next(r for r in self.tables[table].values() if r.id in ids)
+        return record.to_dict() if record is not None else None
+    
+    def _rebuild_indexes(self):
+        """Rebuild every secondary index from the tables"""
+        for table, (_, index) in _INDEXED_FIELDS.items():
+            self.indexes[index] = {}
+            for record in self.tables[table].values():
+                self._index_record(table, record)
+        
+        queries_by_user: Dict[Any, List[str]] = {}
+        history = sorted(self.tables["query_history"].values(), key=lambda q: q.timestamp)
+        for query in history:
+            queries_by_user.setdefault(query.user_id, []).append(query.id)
+        self.indexes["queries_by_user"] = queries_by_user
+        
+        self._rebuild_usage_counters()
+    
+    def _rebuild_usage_counters(self):
+        """Recompute usage totals from the usage_metrics table"""
+        self.counters = _new_usage_counters()
+        self.user_counters = {}
+        self.hourly = {}
+        metrics = self.tables["usage_metrics"]
+        _count_usage_many(self.counters, metrics)
+        
+        by_user: Dict[Any, List[Dict[str, Any]]] = {}
+        by_hour: Dict[int, List[Dict[str, Any]]] = {}
+        for metric in metrics:
+            by_user.setdefault(metric.get("user_id"), []).append(metric)
+            by_hour.setdefault(int(metric["timestamp"].timestamp() // 3600), []).append(metric)
+        
+        for user_id, user_metrics in by_user.items():
+            self.user_counters[user_id] = _new_usage_counters()
+            _count_usage_many(self.user_counters[user_id], user_metrics)
+        for hour, hour_metrics in by_hour.items():
+            self.hourly[hour] = {"counters": _new_usage_counters(), "metrics": hour_metrics}
+            _count_usage_many(self.hourly[hour]["counters"], hour_metrics)
+    
+    def _count_metric(self, metric: Dict[str, Any]):
+        """Add a usage metric to the overall, per-user and hourly totals"""
+        _count_usage(self.counters, metric)
+        user_id = metric.get("user_id")
+        if user_id not in self.user_counters:
+            self.user_counters[user_id] = _new_usage_counters()
+        _count_usage(self.user_counters[user_id], metric)
+        
+        hour = int(metric["timestamp"].timestamp() // 3600)
+        if hour not in self.hourly:
+            self.hourly[hour] = {"counters": _new_usage_counters(), "metrics": []}
+        _count_usage(self.hourly[hour]["counters"], metric)
+        self.hourly[hour]["metrics"].append(metric)
     
     async def initialize(self):
         """Initialize database (create tables)"""
@@ -72,35 +293,41 @@ class MockDatabase:
         ]
         
         for provider in default_providers:
-            self.tables["providers"][provider["id"]] = provider
+            row = ProviderRow.from_dict(provider)
+            self.tables["providers"][row.id] = row
+            self._index_record("providers", row)
     
     # User operations
     async def create_user(self, user_data: Dict[str, Any]) -> str:
         """Create a new user"""
         user_id = str(uuid.uuid4())
         user_data["id"] = user_id
-        user_data["created_at"] = datetime.now()
-        user_data["updated_at"] = datetime.now()
+        now = datetime.now()
+        user_data["created_at"] = now
+        user_data["updated_at"] = now
         
-        self.tables["users"][user_id] = user_data
+        row = UserRow.from_dict(user_data)
+        self.tables["users"][user_id] = row
+        self._index_record("users", row)
         return user_id
     
     async def get_user(self, user_id: str) -> Optional[Dict[str, Any]]:
         """Get user by ID"""
-        return self.tables["users"].get(user_id)
+        row = self.tables["users"].get(user_id)
+        return row.to_dict() if row is not None else None
     
     async def get_user_by_email(self, email: str) -> Optional[Dict[str, Any]]:
         """Get user by email"""
-        for user in self.tables["users"].values():
-            if user.get("email") == email:
-                return user
-        return None
+        return self._lookup("users", email)
     
     async def update_user(self, user_id: str, updates: Dict[str, Any]) -> bool:
         """Update user data"""
-        if user_id in self.tables["users"]:
-            self.tables["users"][user_id].update(updates)
-            self.tables["users"][user_id]["updated_at"] = datetime.now()
+        row = self.tables["users"].get(user_id)
+        if row is not None:
+            self._unindex_record("users", row)
+            row.update(updates)
+            self._index_record("users", row)
+            row.updated_at = datetime.now()
             return True
         return False
     
@@ -109,35 +336,37 @@ class MockDatabase:
         """Create a new provider"""
         provider_id = str(uuid.uuid4())
         provider_data["id"] = provider_id
-        provider_data["created_at"] = datetime.now()
-        provider_data["updated_at"] = datetime.now()
+        now = datetime.now()
+        provider_data["created_at"] = now
+        provider_data["updated_at"] = now
         
-        self.tables["providers"][provider_id] = provider_data
+        row = ProviderRow.from_dict(provider_data)
+        self.tables["providers"][provider_id] = row
+        self._index_record("providers", row)
         return provider_id
     
     async def get_provider(self, provider_id: str) -> Optional[Dict[str, Any]]:
         """Get provider by ID"""
-        return self.tables["providers"].get(provider_id)
+        row = self.tables["providers"].get(provider_id)
+        return row.to_dict() if row is not None else None
     
     async def get_provider_by_name(self, name: str) -> Optional[Dict[str, Any]]:
         """Get provider by name"""
-        for provider in self.tables["providers"].values():
-            if provider.get("name") == name:
-                return provider
-        return None
+        return self._lookup("providers", name)
     
     async def list_providers(self, status: Optional[str] = None) -> List[Dict[str, Any]]:
         """List all providers"""
-        providers = list(self.tables["providers"].values())
-        if status:
-            providers = [p for p in providers if p.get("status") == status]
-        return providers
+        providers = self.tables["providers"].values()
+        return [p.to_dict() for p in providers if not status or p.status == status]
     
     async def update_provider(self, provider_id: str, updates: Dict[str, Any]) -> bool:
         """Update provider data"""
-        if provider_id in self.tables["providers"]:
-            self.tables["providers"][provider_id].update(updates)
-            self.tables["providers"][provider_id]["updated_at"] = datetime.now()
+        row = self.tables["providers"].get(provider_id)
+        if row is not None:
+            self._unindex_record("providers", row)
+            row.update(updates)
+            self._index_record("providers", row)
+            row.updated_at = datetime.now()
             return True
         return False
     
@@ -150,21 +379,21 @@ class MockDatabase:
         key_data["last_used"] = None
         key_data["usage_count"] = 0
         
-        self.tables["api_keys"][key_id] = key_data
+        row = ApiKeyRow.from_dict(key_data)
+        self.tables["api_keys"][key_id] = row
+        self._index_record("api_keys", row)
         return key_id
     
     async def get_api_key_by_hash(self, key_hash: str) -> Optional[Dict[str, Any]]:
         """Get API key by hash"""
-        for key_data in self.tables["api_keys"].values():
-            if key_data.get("key_hash") == key_hash:
-                return key_data
-        return None
+        return self._lookup("api_keys", key_hash)
     
     async def update_api_key_usage(self, key_id: str) -> bool:
         """Update API key usage statistics"""
-        if key_id in self.tables["api_keys"]:
-            self.tables["api_keys"][key_id]["last_used"] = datetime.now()
-            self.tables["api_keys"][key_id]["usage_count"] += 1
+        row = self.tables["api_keys"].get(key_id)
+        if row is not None:
+            row.last_used = datetime.now()
+            row.usage_count += 1
             return True
         return False
     
@@ -175,7 +404,9 @@ class MockDatabase:
         query_data["id"] = query_id
         query_data["timestamp"] = datetime.now()
         
-        self.tables["query_history"][query_id] = query_data
+        row = QueryRow.from_dict(query_data)
+        self.tables["query_history"][query_id] = row
+        self.indexes["queries_by_user"].setdefault(row.user_id, []).append(query_id)
         return query_id
     
     async def get_query_history(
@@ -185,15 +416,12 @@ class MockDatabase:
         offset: int = 0
     ) -> List[Dict[str, Any]]:
         """Get query history for user"""
-        user_queries = [
-            q for q in self.tables["query_history"].values()
-            if q.get("user_id") == user_id
-        ]
-        
-        # Sort by timestamp descending
-        user_queries.sort(key=lambda x: x["timestamp"], reverse=True)
-        
-        return user_queries[offset:offset + limit]
+        # Ids are kept oldest first, so the newest page is a slice from the end
+        ids = self.indexes["queries_by_user"].get(user_id, [])
+        end = max(len(ids) - offset, 0)
+        start = max(end - limit, 0)
+        queries = self.tables["query_history"]
+        return [queries[query_id].to_dict() for query_id in reversed(ids[start:end])]
     
     # Usage metrics operations
     async def log_usage(self, usage_data: Dict[str, Any]) -> int:
@@ -205,6 +433,7 @@ class MockDatabase:
         usage_data["timestamp"] = datetime.now()
         
         self.tables["usage_metrics"].append(usage_data)
+        self._count_metric(usage_data)
         return metric_id
     
     async def get_usage_stats(
@@ -214,31 +443,19 @@ class MockDatabase:
         end_date: Optional[datetime] = None
     ) -> Dict[str, Any]:
         """Get usage statistics"""
-        metrics = self.tables["usage_metrics"]
-        
-        # Filter by user
-        if user_id:
-            metrics = [m for m in metrics if m.get("user_id") == user_id]
-        
-        # Filter by date range
-        if start_date:
-            metrics = [m for m in metrics if m["timestamp"] >= start_date]
-        if end_date:
-            metrics = [m for m in metrics if m["timestamp"] <= end_date]
-        
-        # Aggregate statistics
-        total_requests = len(metrics)
-        total_tokens = sum(m.get("tokens_used", 0) for m in metrics)
-        
-        by_provider = {}
-        by_operation = {}
+        if not start_date and not end_date:
+            # Running totals answer whole-history queries directly
+            if user_id:
+                counters = self.user_counters.get(user_id) or _new_usage_counters()
+            else:
+                counters = self.counters
+        else:
+            counters = self._usage_in_range(user_id, start_date, end_date)
         
-        for metric in metrics:
-            provider = metric.get("provider", "unknown")
-            operation = metric.get("operation", "unknown")
-            
-            by_provider[provider] = by_provider.get(provider, 0) + 1
-            by_operation[operation] = by_operation.get(operation, 0) + 1
+        total_requests = counters["total_requests"]
+        total_tokens = counters["total_tokens"]
+        by_provider = dict(counters["by_provider"])
+        by_operation = dict(counters["by_operation"])
         
         return {
             "total_requests": total_requests,
@@ -249,6 +466,47 @@ class MockDatabase:
             "period_end": end_date
         }
     
+    def _usage_in_range(
+        self,
+        user_id: Optional[str],
+        start_date: Optional[datetime],
+        end_date: Optional[datetime]
+    ) -> Dict[str, Any]:
+        """Sum usage over the hourly buckets a date range touches"""
+        start_ts = start_date.timestamp() if start_date else None
+        end_ts = end_date.timestamp() if end_date else None
+        counters = _new_usage_counters()
+        edge_metrics = []
+        
+        for hour, bucket in self.hourly.items():
+            hour_start = hour * 3600
+            hour_end = hour_start + 3600
+            if (start_ts is not None and hour_end <= start_ts) or (end_ts is not None and hour_start > end_ts):
+                continue
+            
+            covered = (
+                (start_ts is None or start_ts <= hour_start) and
+                (end_ts is None or hour_end <= end_ts)
+            )
+            if covered and not user_id:
+                # Whole hour in range: use its totals
+                for key in ("total_requests", "total_tokens"):
+                    counters[key] += bucket["counters"][key]
+                counters["by_provider"].update(bucket["counters"]["by_provider"])
+                counters["by_operation"].update(bucket["counters"]["by_operation"])
+                continue
+            
+            # Hours at the edges of the range, or filtered by user, are checked per metric
+            edge_metrics.extend(
+                m for m in bucket["metrics"]
+                if (not user_id or m.get("user_id") == user_id)
+                and (not start_date or m["timestamp"] >= start_date)
+                and (not end_date or m["timestamp"] <= end_date)
+            )
+        
+        _count_usage_many(counters, edge_metrics)
+        return counters
+    
     # Utility operations
     async def health_check(self) -> Dict[str, Any]:
         """Database health check"""
@@ -268,19 +526,25 @@ class MockDatabase:
                 self.tables[table_name].clear()
             elif isinstance(self.tables[table_name], list):
                 self.tables[table_name].clear()
+            if table_name in _INDEXED_FIELDS:
+                self.indexes[_INDEXED_FIELDS[table_name][1]].clear()
+            elif table_name == "query_history":
+                self.indexes["queries_by_user"].clear()
+            elif table_name == "usage_metrics":
+                self._rebuild_usage_counters()
             return True
         return False
     
-    async def backup_data(self) -> Dict[str, Any]:
+    async def backup_data(self, deep: bool = False) -> Dict[str, Any]:
         """Create backup of all data"""
-        backup = {}
-        for table, data in self.tables.items():
-            if isinstance(data, dict):
-                backup[table] = {k: v for k, v in data.items()}
-            elif isinstance(data, list):
-                backup[table] = [item for item in data]
-            else:
-                backup[table] = data
+        if deep:
+            # Records are copied too, so later updates can't reach the backup
+            backup = copy.deepcopy(self.tables)
+        else:
+            backup = {
+                table: data.copy() if isinstance(data, (dict, list)) else data
+                for table, data in self.tables.items()
+            }
         
         return {
             "tables": backup,
@@ -290,9 +554,39 @@ class MockDatabase:
     
     async def restore_data(self, backup: Dict[str, Any]) -> bool:
         """Restore data from backup"""
+        # Keep the current state so a backup that fails to load changes nothing
+        previous = (
+            self.tables, self.sequences, self.indexes,
+            self.counters, self.user_counters, self.hourly
+        )
         try:
-            self.tables = backup["tables"]
+            tables = dict(backup["tables"])
+            # Older backups (and JSON round trips) hold plain dict records
+            for table, row_type in _ROW_TYPES.items():
+                if table in tables:
+                    tables[table] = {
+                        record_id: row_type.from_dict(record) if isinstance(record, dict) else record
+                        for record_id, record in tables[table].items()
+                    }
+            
+            # Usage totals and history order need real datetimes back
+            for query in tables.get("query_history", {}).values():
+                query.timestamp = _as_datetime(query.timestamp)
+            if "usage_metrics" in tables:
+                tables["usage_metrics"] = [
+                    {**metric, "timestamp": _as_datetime(metric["timestamp"])}
+                    if isinstance(metric["timestamp"], str) else metric
+                    for metric in tables["usage_metrics"]
+                ]
+            
+            self.tables = tables
             self.sequences = backup.get("sequences", {"usage_metrics_id": 0})
+            self.indexes = {index: {} for index in self.indexes}
+            self._rebuild_indexes()
             return True
         except Exception:
+            (
+                self.tables, self.sequences, self.indexes,
+                self.counters, self.user_counters, self.hourly
+            ) = previous
             return False
\ No newline at end of file
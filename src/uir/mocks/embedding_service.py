@@ -3,97 +3,161 @@
 import hashlib
 import numpy as np
 from typing import List, Dict, Any
+from collections import OrderedDict
 import asyncio
 
 
+# Keyword -> (slice of the embedding it boosts, boost)
+_KEYWORD_BOOSTS = (
+    ("machine learning", slice(0, 50), 0.3),
+    ("deep learning", slice(50, 100), 0.3),
+    ("transformer", slice(100, 150), 0.4),
+    ("attention", slice(150, 200), 0.35),
+    ("neural", slice(200, 250), 0.3),
+    ("search", slice(250, 300), 0.25),
+    ("query", slice(300, 350), 0.25),
+    ("document", slice(350, 400), 0.3),
+    ("vector", slice(400, 450), 0.35),
+    ("semantic", slice(450, 500), 0.4)
+)
+
+
 class MockEmbeddingService:
     """Mock embedding service that generates deterministic embeddings"""
     
-    def __init__(self, dimension: int = 768):
+    def __init__(self, dimension: int = 768, cache_size: int = 10000):
         self.dimension = dimension
-        self.cache = {}
+        self.cache_size = cache_size
+        # Least recently used first, so eviction pops from the front
+        self.cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
         self.model_name = "mock-embedding-model"
+        
+        # One boost row per keyword, so matched keywords apply as a single matmul
+        self._keywords = tuple(keyword for keyword, _, _ in _KEYWORD_BOOSTS)
+        self._boosts = np.zeros((len(_KEYWORD_BOOSTS), dimension), dtype=np.float32)
+        for row, (_, columns, boost) in zip(self._boosts, _KEYWORD_BOOSTS):
+            row[columns] = boost
     
-    async def embed(self, text: str) -> List[float]:
+    async def embed(self, text: str) -> np.ndarray:
         """Generate deterministic embedding from text"""
         # Check cache first
-        if text in self.cache:
-            return self.cache[text]
-        
-        # Generate deterministic embedding based on text content
-        # This ensures same text always gets same embedding
-        text_hash = hashlib.md5(text.encode()).hexdigest()
+        embedding = self.cache.get(text)
+        if embedding is not None:
+            self.cache.move_to_end(text)
+            return embedding
         
-        # Convert hash to numbers
-        np.random.seed(int(text_hash[:8], 16))
+        embedding = self._generate([text])[0]
         
-        # Generate embedding with some structure
-        embedding = []
+        # Cache for consistency
+        self._remember(text, embedding)
         
-        # Add some semantic structure based on text features
-        text_lower = text.lower()
+        # Simulate API latency
+        await asyncio.sleep(0.01)
         
-        # Base random values
-        base_embedding = np.random.randn(self.dimension) * 0.5
+        return embedding
+    
+    async def embed_many(self, texts: List[str]) -> np.ndarray:
+        """Embed multiple texts in one vectorized pass, one row per text"""
+        missing = list(dict.fromkeys(text for text in texts if text not in self.cache))
+        fresh = dict(zip(missing, self._generate(missing))) if missing else {}
         
-        # Add semantic signals
-        if "machine learning" in text_lower:
-            base_embedding[0:50] += 0.3
-        if "deep learning" in text_lower:
-            base_embedding[50:100] += 0.3
-        if "transformer" in text_lower:
-            base_embedding[100:150] += 0.4
-        if "attention" in text_lower:
-            base_embedding[150:200] += 0.35
-        if "neural" in text_lower:
-            base_embedding[200:250] += 0.3
-        if "search" in text_lower:
-            base_embedding[250:300] += 0.25
-        if "query" in text_lower:
-            base_embedding[300:350] += 0.25
-        if "document" in text_lower:
-            base_embedding[350:400] += 0.3
-        if "vector" in text_lower:
-            base_embedding[400:450] += 0.35
-        if "semantic" in text_lower:
-            base_embedding[450:500] += 0.4
+        # Collect rows before caching the new ones, which may evict cached hits
+        rows = []
+        for text in texts:
+            if text in fresh:
+                rows.append(fresh[text])
+            else:
+                self.cache.move_to_end(text)
+                rows.append(self.cache[text])
         
-        # Add length signal
-        base_embedding[500:510] += len(text) / 100.0
+        if missing:
+            for text, embedding in fresh.items():
+                self._remember(text, embedding)
+            
+            # Simulate a single batched API call
+            await asyncio.sleep(0.01)
         
-        # Normalize to unit vector
-        norm = np.linalg.norm(base_embedding)
-        if norm > 0:
-            base_embedding = base_embedding / norm
+        if not rows:
+            return np.empty((0, self.dimension), dtype=np.float32)
+        return np.stack(rows)
+    
+    def _remember(self, text: str, embedding: np.ndarray):
+        """Cache an embedding, evicting the least recently used beyond cache_size"""
+        self.cache[text] = embedding
+        self.cache.move_to_end(text)
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+    
+    def _match_keywords(self, text_lower: str) -> List[bool]:
+        """Flag which keywords occur in already-lowercased text"""
+        # With only ten keywords, C-level substring checks beat a multi-pattern
+        # automaton, which has to yield every occurrence back to Python
+        return [keyword in text_lower for keyword in self._keywords]
+    
+    def _generate(self, texts: List[str]) -> np.ndarray:
+        """Build unit-norm float32 embeddings for texts"""
+        # Expand a hash of each text straight into the base values, so the
+        # same text always gets the same embedding without any RNG state
+        raw = b"".join(hashlib.shake_256(text.encode()).digest(self.dimension * 4) for text in texts)
+        base_embedding = np.frombuffer(raw, dtype=np.uint32).reshape(len(texts), self.dimension)
+        base_embedding = base_embedding.astype(np.float32) / 2**32 - 0.5
         
-        embedding = base_embedding.tolist()
+        # Add some semantic structure based on text features
+        keyword_mask = np.array(
+            [self._match_keywords(text.lower()) for text in texts],
+            dtype=np.float32
+        ).reshape(len(texts), len(self._keywords))
+        base_embedding += keyword_mask @ self._boosts
         
-        # Cache for consistency
-        self.cache[text] = embedding
+        # Add length signal
+        base_embedding[:, 500:510] += np.array([len(text) for text in texts])[:, None] / 100.0
         
-        # Simulate API latency
-        await asyncio.sleep(0.01)
+        # Normalize to unit vectors
+        norms = np.linalg.norm(base_embedding, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
         
-        return embedding
+        return (base_embedding / norms).astype(np.float32, copy=False)
     
-    async def embed_batch(self, texts: List[str]) -> List[List[float]]:
-        """Embed multiple texts"""
-        tasks = [self.embed(text) for text in texts]
-        return await asyncio.gather(*tasks)
+    async def embed_list(self, text: str) -> List[float]:
+        """Embedding as a plain list, for callers that need JSON-friendly values"""
+        return (await self.embed(text)).tolist()
     
-    def similarity(self, embedding1: List[float], embedding2: List[float]) -> float:
-        """Calculate cosine similarity between embeddings"""
-        vec1 = np.array(embedding1)
-        vec2 = np.array(embedding2)
+    async def embed_batch(self, texts: List[str]) -> np.ndarray:
+        """Embed multiple texts, one row per text"""
+        if not texts:
+            return np.empty((0, self.dimension), dtype=np.float32)
         
-        dot_product = np.dot(vec1, vec2)
-        norm1 = np.linalg.norm(vec1)
-        norm2 = np.linalg.norm(vec2)
+        # Embed each distinct text once, then scatter back to the input order
+        unique = list(dict.fromkeys(texts))
+        embeddings = await asyncio.gather(*(self.embed(text) for text in unique))
+        by_text = dict(zip(unique, embeddings))
+        return np.stack([by_text[text] for text in texts])
+    
+    def similarity(self, embedding1: np.ndarray, embedding2: np.ndarray) -> float:
+        """Calculate cosine similarity between embeddings"""
+        # No copy for embeddings this service produced; lists are converted once
+        vec1 = np.asarray(embedding1, dtype=np.float32)
+        vec2 = np.asarray(embedding2, dtype=np.float32)
         
-        if norm1 == 0 or norm2 == 0:
+        norm_product = np.sqrt(np.inner(vec1, vec1) * np.inner(vec2, vec2))
+        if norm_product == 0:
             return 0.0
         
-        return float(dot_product / (norm1 * norm2))
+        return float(np.inner(vec1, vec2) / norm_product)
+    
+    async def similarity_batch(self, query_embedding: np.ndarray, texts: List[str]) -> np.ndarray:
+        """Cosine similarity of a query embedding against many texts in one matrix-vector product"""
+        # Stored embeddings are unit vectors, so only the query needs normalizing
+        matrix = await self.embed_many(texts)
+        query = np.asarray(query_embedding, dtype=np.float32)
+        norm = np.sqrt(np.inner(query, query))
+        if norm == 0:
+            return np.zeros(len(texts), dtype=np.float32)
+        return matrix @ (query / norm)
+    
+    def reset(self):
+        """Clear cached embeddings"""
+        self.cache.clear()
     
     async def get_model_info(self) -> Dict[str, Any]:
         """Get model information"""
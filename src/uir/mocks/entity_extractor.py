@@ -1,193 +1,285 @@
 """Mock entity extractor with comprehensive patterns"""
 
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 from datetime import datetime
 import asyncio
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+_PATTERNS = {
+    "DATE": [
+        r'\b\d{4}-\d{2}-\d{2}\b',  # 2024-01-15
+        r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',  # 1/15/2024, 01/15/24
+        r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b',  # January 15, 2024
+        r'\b\d{1,2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{4}\b',  # 15 January 2024
+    ],
+    "EMAIL": [
+        r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
+    ],
+    "URL": [
+        r'https?://[^\s<>"{}|\\^`\[\]]+',
+        r'www\.[^\s<>"{}|\\^`\[\]]+',
+        r'[a-zA-Z0-9][a-zA-Z0-9-]*[a-zA-Z0-9]*\.(?:com|org|net|edu|gov|mil|int|arpa|biz|info|name|museum|coop|aero|[a-z]{2})\b'
+    ],
+    "PHONE": [
+        r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b',
+        r'\b\d{3}-\d{3}-\d{4}\b',
+        r'\(\d{3}\)\s?\d{3}-\d{4}'
+    ],
+    "MONEY": [
+        r'\$\d+(?:,\d{3})*(?:\.\d{2})?',
+        r'\b\d+(?:,\d{3})*(?:\.\d{2})?\s?(?:USD|dollars?|cents?)\b',
+    ],
+    "PERCENTAGE": [
+        r'\b\d+(?:\.\d+)?%',
+        r'\b\d+(?:\.\d+)?\s?percent\b'
+    ],
+    "TIME": [
+        r'\b\d{1,2}:\d{2}(?::\d{2})?\s?(?:AM|PM|am|pm)?\b',
+        r'\b(?:morning|afternoon|evening|night)\b'
+    ]
+}
+
+# Technology and domain-specific entities
+_KEYWORD_ENTITIES = {
+    "TECHNOLOGY": [
+        "transformer", "transformers", "bert", "gpt", "gpt-2", "gpt-3", "gpt-4",
+        "attention", "self-attention", "multi-head", "encoder", "decoder",
+        "neural network", "neural networks", "cnn", "rnn", "lstm", "gru",
+        "machine learning", "deep learning", "artificial intelligence", "ai",
+        "natural language processing", "nlp", "computer vision", "cv",
+        "reinforcement learning", "supervised learning", "unsupervised learning",
+        "classification", "regression", "clustering", "dimensionality reduction",
+        "tensorflow", "pytorch", "keras", "scikit-learn", "pandas", "numpy",
+        "python", "java", "javascript", "go", "rust", "c++", "sql",
+        "docker", "kubernetes", "aws", "azure", "gcp", "cloud computing",
+        "api", "rest", "graphql", "microservices", "database", "nosql",
+        "elasticsearch", "mongodb", "postgresql", "redis", "cassandra",
+        "spark", "hadoop", "kafka", "rabbitmq", "nginx", "apache"
+    ],
+    "ORGANIZATION": [
+        "google", "microsoft", "apple", "amazon", "meta", "facebook",
+        "netflix", "uber", "airbnb", "twitter", "linkedin", "github",
+        "openai", "huggingface", "deepmind", "nvidia", "intel", "amd",
+        "mit", "stanford", "harvard", "berkeley", "carnegie mellon",
+        "ieee", "acm", "arxiv", "pubmed", "nature", "science"
+    ],
+    "PERSON": [
+        "john", "jane", "smith", "johnson", "brown", "davis", "miller",
+        "wilson", "moore", "taylor", "anderson", "thomas", "jackson",
+        "white", "harris", "martin", "thompson", "garcia", "martinez",
+        "robinson", "clark", "rodriguez", "lewis", "lee", "walker"
+    ],
+    "LOCATION": [
+        "new york", "los angeles", "chicago", "houston", "phoenix",
+        "philadelphia", "san antonio", "san diego", "dallas", "san jose",
+        "austin", "jacksonville", "san francisco", "columbus", "charlotte",
+        "fort worth", "indianapolis", "seattle", "denver", "boston",
+        "california", "texas", "florida", "new york", "pennsylvania",
+        "illinois", "ohio", "georgia", "north carolina", "michigan",
+        "usa", "united states", "america", "canada", "uk", "england",
+        "france", "germany", "italy", "spain", "japan", "china", "india"
+    ],
+    "RESEARCH_FIELD": [
+        "computer science", "machine learning", "artificial intelligence",
+        "data science", "statistics", "mathematics", "physics",
+        "biology", "chemistry", "medicine", "psychology", "neuroscience",
+        "linguistics", "economics", "finance", "engineering",
+        "electrical engineering", "software engineering", "bioengineering"
+    ]
+}
+
+# Numbers and quantities
+_NUMBER_PATTERNS = [
+    (r'\b\d+(?:,\d{3})*(?:\.\d+)?\s?(?:billion|million|thousand|hundred)\b', "QUANTITY"),
+    (r'\b\d+(?:,\d{3})*(?:\.\d+)?\b', "NUMBER"),
+    (r'\b(?:first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth)\b', "ORDINAL"),
+    (r'\b(?:one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)\b', "CARDINAL")
+]
+
+_CONFIDENCE = {
+    **{entity_type: 0.95 for entity_type in _PATTERNS},
+    **{entity_type: 0.9 for entity_type in _KEYWORD_ENTITIES},
+    **{entity_type: 0.85 for _, entity_type in _NUMBER_PATTERNS}
+}
+
+
+class _Entity(NamedTuple):
+    """Compact entity record, turned into a dict only when returned"""
+    text: str
+    type: str
+    value: str
+    confidence: float
+    start: int
+    end: int
+
+
+def _build_entity_regex(keywords: bool = True) -> re.Pattern:
+    """Combine every entity pattern into one alternation of named groups"""
+    # Alternatives are ordered by confidence so that, for matches starting at
+    # the same position, the one the overlap filter would keep wins
+    groups = [
+        f"(?P<{entity_type}>{'|'.join(patterns)})"
+        for entity_type, patterns in _PATTERNS.items()
+    ]
+    keyword_entities = _KEYWORD_ENTITIES if keywords else {}
+    for entity_type, entity_keywords in keyword_entities.items():
+        # Longest keywords first, so "gpt-4" is not cut short by "gpt"; repeats
+        # (e.g. "new york") only add dead branches, so each appears once
+        unique = sorted(dict.fromkeys(entity_keywords), key=len, reverse=True)
+        alternatives = "|".join(re.escape(k) for k in unique)
+        groups.append(f"(?P<{entity_type}>\\b(?:{alternatives})\\b)")
+    groups += [f"(?P<{entity_type}>{pattern})" for pattern, entity_type in _NUMBER_PATTERNS]
+    return re.compile("|".join(groups), re.IGNORECASE)
+
+
+def _build_keyword_automaton() -> Optional["ahocorasick.Automaton"]:
+    """Build one Aho-Corasick automaton over every keyword, if available"""
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for rank, (entity_type, keywords) in enumerate(_KEYWORD_ENTITIES.items()):
+        for keyword in keywords:
+            # A keyword listed under several types keeps the first, as in the regex
+            if keyword not in automaton:
+                automaton.add_word(keyword, (rank, entity_type, len(keyword)))
+    automaton.make_automaton()
+    return automaton
+
+
+def _is_word(char: str) -> bool:
+    """Match re's notion of a word character"""
+    return char.isalnum() or char == "_"
+
+
+def _at_boundary(text: str, index: int) -> bool:
+    """Check for a word boundary (re's \\b) before text[index]"""
+    before = index > 0 and _is_word(text[index - 1])
+    after = index < len(text) and _is_word(text[index])
+    return before != after
+
+
+_ENTITY_RE = _build_entity_regex()
+_WORD_RE = re.compile(r'\w+')
+# A keyword match always starts with its first word as a whole word of the text
+_KEYWORD_FIRST_WORDS = frozenset(
+    _WORD_RE.match(keyword).group()
+    for keywords in _KEYWORD_ENTITIES.values()
+    for keyword in keywords
+)
+# The structured and number patterns alone, for text without keywords or when
+# pyahocorasick finds the keywords in one linear scan
+_PATTERN_RE = _build_entity_regex(keywords=False)
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
 
 class MockEntityExtractor:
     """Mock entity extractor with comprehensive pattern matching"""
     
     def __init__(self):
-        self.patterns = {
-            "DATE": [
-                r'\b\d{4}-\d{2}-\d{2}\b',  # 2024-01-15
-                r'\b\d{1,2}[/-]\d{1,2}[/-]\d{2,4}\b',  # 1/15/2024, 01/15/24
-                r'\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{1,2},? \d{4}\b',  # January 15, 2024
-                r'\b\d{1,2} (?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec)[a-z]* \d{4}\b',  # 15 January 2024
-            ],
-            "EMAIL": [
-                r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            ],
-            "URL": [
-                r'https?://[^\s<>"{}|\\^`\[\]]+',
-                r'www\.[^\s<>"{}|\\^`\[\]]+',
-                r'[a-zA-Z0-9][a-zA-Z0-9-]*[a-zA-Z0-9]*\.(?:com|org|net|edu|gov|mil|int|arpa|biz|info|name|museum|coop|aero|[a-z]{2})\b'
-            ],
-            "PHONE": [
-                r'\b(?:\+?1[-.\s]?)?\(?[0-9]{3}\)?[-.\s]?[0-9]{3}[-.\s]?[0-9]{4}\b',
-                r'\b\d{3}-\d{3}-\d{4}\b',
-                r'\(\d{3}\)\s?\d{3}-\d{4}'
-            ],
-            "MONEY": [
-                r'\$\d+(?:,\d{3})*(?:\.\d{2})?',
-                r'\b\d+(?:,\d{3})*(?:\.\d{2})?\s?(?:USD|dollars?|cents?)\b',
-            ],
-            "PERCENTAGE": [
-                r'\b\d+(?:\.\d+)?%',
-                r'\b\d+(?:\.\d+)?\s?percent\b'
-            ],
-            "TIME": [
-                r'\b\d{1,2}:\d{2}(?::\d{2})?\s?(?:AM|PM|am|pm)?\b',
-                r'\b(?:morning|afternoon|evening|night)\b'
-            ]
-        }
-        
-        # Technology and domain-specific entities
-        self.keyword_entities = {
-            "TECHNOLOGY": [
-                "transformer", "transformers", "bert", "gpt", "gpt-2", "gpt-3", "gpt-4",
-                "attention", "self-attention", "multi-head", "encoder", "decoder",
-                "neural network", "neural networks", "cnn", "rnn", "lstm", "gru",
-                "machine learning", "deep learning", "artificial intelligence", "ai",
-                "natural language processing", "nlp", "computer vision", "cv",
-                "reinforcement learning", "supervised learning", "unsupervised learning",
-                "classification", "regression", "clustering", "dimensionality reduction",
-                "tensorflow", "pytorch", "keras", "scikit-learn", "pandas", "numpy",
-                "python", "java", "javascript", "go", "rust", "c++", "sql",
-                "docker", "kubernetes", "aws", "azure", "gcp", "cloud computing",
-                "api", "rest", "graphql", "microservices", "database", "nosql",
-                "elasticsearch", "mongodb", "postgresql", "redis", "cassandra",
-                "spark", "hadoop", "kafka", "rabbitmq", "nginx", "apache"
-            ],
-            "ORGANIZATION": [
-                "google", "microsoft", "apple", "amazon", "meta", "facebook",
-                "netflix", "uber", "airbnb", "twitter", "linkedin", "github",
-                "openai", "huggingface", "deepmind", "nvidia", "intel", "amd",
-                "mit", "stanford", "harvard", "berkeley", "carnegie mellon",
-                "ieee", "acm", "arxiv", "pubmed", "nature", "science"
-            ],
-            "PERSON": [
-                "john", "jane", "smith", "johnson", "brown", "davis", "miller",
-                "wilson", "moore", "taylor", "anderson", "thomas", "jackson",
-                "white", "harris", "martin", "thompson", "garcia", "martinez",
-                "robinson", "clark", "rodriguez", "lewis", "lee", "walker"
-            ],
-            "LOCATION": [
-                "new york", "los angeles", "chicago", "houston", "phoenix",
-                "philadelphia", "san antonio", "san diego", "dallas", "san jose",
-                "austin", "jacksonville", "san francisco", "columbus", "charlotte",
-                "fort worth", "indianapolis", "seattle", "denver", "boston",
-                "california", "texas", "florida", "new york", "pennsylvania",
-                "illinois", "ohio", "georgia", "north carolina", "michigan",
-                "usa", "united states", "america", "canada", "uk", "england",
-                "france", "germany", "italy", "spain", "japan", "china", "india"
-            ],
-            "RESEARCH_FIELD": [
-                "computer science", "machine learning", "artificial intelligence",
-                "data science", "statistics", "mathematics", "physics",
-                "biology", "chemistry", "medicine", "psychology", "neuroscience",
-                "linguistics", "economics", "finance", "engineering",
-                "electrical engineering", "software engineering", "bioengineering"
-            ]
-        }
+        self.patterns = _PATTERNS
+        self.keyword_entities = _KEYWORD_ENTITIES
     
     async def extract(self, text: str) -> List[Dict[str, Any]]:
         """Extract entities from text"""
-        entities = []
-        text_lower = text.lower()
-        
-        # Extract pattern-based entities
-        for entity_type, patterns in self.patterns.items():
-            for pattern in patterns:
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    entities.append({
-                        "text": match.group(),
-                        "type": entity_type,
-                        "value": match.group(),
-                        "confidence": 0.95,
-                        "start": match.start(),
-                        "end": match.end()
-                    })
+        lowered = text.lower()
+        # Lowercasing can change the length of some non-ASCII text, which
+        # would shift the automaton's offsets; the combined regex handles that
+        use_automaton = _KEYWORD_AUTOMATON is not None and len(lowered) == len(text)
         
-        # Extract keyword-based entities
-        for entity_type, keywords in self.keyword_entities.items():
-            for keyword in keywords:
-                # Find whole word matches
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                matches = re.finditer(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    # Calculate confidence based on exact match
-                    confidence = 0.9 if match.group().lower() == keyword else 0.8
-                    
-                    entities.append({
-                        "text": match.group(),
-                        "type": entity_type,
-                        "value": keyword,
-                        "confidence": confidence,
-                        "start": match.start(),
-                        "end": match.end()
-                    })
+        if _KEYWORD_FIRST_WORDS.isdisjoint(_WORD_RE.findall(lowered)):
+            # No keyword can match, so only the structured and number patterns run
+            spans = [(m.start(), m.end(), m.lastgroup) for m in _PATTERN_RE.finditer(text)]
+        elif use_automaton:
+            spans = self._scan_with_automaton(text, lowered)
+        else:
+            # Single pass over the text; the named group tells us the entity type
+            spans = [(m.start(), m.end(), m.lastgroup) for m in _ENTITY_RE.finditer(text)]
         
-        # Extract numbers and quantities
-        number_patterns = [
-            (r'\b\d+(?:,\d{3})*(?:\.\d+)?\s?(?:billion|million|thousand|hundred)\b', "QUANTITY"),
-            (r'\b\d+(?:,\d{3})*(?:\.\d+)?\b', "NUMBER"),
-            (r'\b(?:first|second|third|fourth|fifth|sixth|seventh|eighth|ninth|tenth)\b', "ORDINAL"),
-            (r'\b(?:one|two|three|four|five|six|seven|eight|nine|ten|eleven|twelve)\b', "CARDINAL")
-        ]
-        
-        for pattern, entity_type in number_patterns:
-            matches = re.finditer(pattern, text, re.IGNORECASE)
-            for match in matches:
-                entities.append({
-                    "text": match.group(),
-                    "type": entity_type,
-                    "value": match.group(),
-                    "confidence": 0.85,
-                    "start": match.start(),
-                    "end": match.end()
-                })
+        entities = []
+        for start, end, entity_type in spans:
+            matched = text[start:end]
+            
+            # Keyword entities report the canonical lowercase keyword
+            value = matched.lower() if entity_type in _KEYWORD_ENTITIES else matched
+            
+            entities.append(_Entity(matched, entity_type, value, _CONFIDENCE[entity_type], start, end))
         
-        # Remove duplicates and overlapping entities
+        # Remove duplicates and overlapping entities; the result is in text order
         entities = self._remove_overlaps(entities)
         
-        # Sort by position in text
-        entities.sort(key=lambda x: x["start"])
-        
         # Simulate processing time
         await asyncio.sleep(0.005)
         
-        return entities
+        return [entity._asdict() for entity in entities]
+    
+    def _match_keywords(self, lowered: str) -> List[Tuple[int, int, str]]:
+        """Find whole-word keywords, one per start position, in text order"""
+        # Same pick as the regex: the first type with a match, then its longest
+        best: Dict[int, Tuple[Tuple[int, int], Tuple[int, int, str]]] = {}
+        for last, (rank, entity_type, length) in _KEYWORD_AUTOMATON.iter(lowered):
+            start = last - length + 1
+            if not (_at_boundary(lowered, start) and _at_boundary(lowered, last + 1)):
+                continue
+            if start not in best or (rank, -length) < best[start][0]:
+                best[start] = ((rank, -length), (start, last + 1, entity_type))
+        return [best[start][1] for start in sorted(best)]
     
-    def _remove_overlaps(self, entities: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    def _scan_with_automaton(self, text: str, lowered: str) -> List[Tuple[int, int, str]]:
+        """Merge keyword and pattern matches as one left-to-right scan would"""
+        keywords = self._match_keywords(lowered)
+        spans = []
+        pos = 0
+        k = 0
+        match = _PATTERN_RE.search(text)
+        while True:
+            # Like finditer, nothing may start inside the previous match
+            while k < len(keywords) and keywords[k][0] < pos:
+                k += 1
+            if match is not None and match.start() < pos:
+                match = _PATTERN_RE.search(text, pos)
+            keyword = keywords[k] if k < len(keywords) else None
+            
+            if match is None and keyword is None:
+                return spans
+            # At the same start, structured patterns beat keywords and keywords beat numbers
+            if keyword is None or (match is not None and (
+                match.start() < keyword[0] or
+                (match.start() == keyword[0] and match.lastgroup in _PATTERNS)
+            )):
+                span = (match.start(), match.end(), match.lastgroup)
+            else:
+                span = keyword
+            spans.append(span)
+            pos = span[1]
+    
+    def _remove_overlaps(self, entities: List[_Entity]) -> List[_Entity]:
         """Remove overlapping entities, keeping highest confidence ones"""
         if not entities:
             return entities
         
         # Sort by start position, then by confidence (descending)
-        entities.sort(key=lambda x: (x["start"], -x["confidence"]))
+        entities.sort(key=lambda x: (x.start, -x.confidence))
         
+        # Sweep runs of overlapping entities, keeping the most confident of each
         filtered = []
-        for entity in entities:
-            # Check if this entity overlaps with any already accepted entity
-            overlaps = False
-            for accepted in filtered:
-                if (entity["start"] < accepted["end"] and 
-                    entity["end"] > accepted["start"]):
-                    # There's an overlap
-                    if entity["confidence"] <= accepted["confidence"]:
-                        overlaps = True
-                        break
-                    else:
-                        # This entity has higher confidence, remove the accepted one
-                        filtered.remove(accepted)
-                        break
-            
-            if not overlaps:
-                filtered.append(entity)
+        best = entities[0]
+        group_end = best.end
+        for entity in entities[1:]:
+            if entity.start < group_end:
+                if entity.confidence > best.confidence:
+                    best = entity
+                group_end = max(group_end, entity.end)
+            else:
+                filtered.append(best)
+                best = entity
+                group_end = entity.end
+        filtered.append(best)
         
         return filtered
     
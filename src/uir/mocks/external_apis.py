@@ -1,12 +1,27 @@
 """Mock external APIs for testing without real services"""
 
 import asyncio
+import fnmatch
 import hashlib
 import json
 import random
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 import numpy as np
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def _seed_for(text: str) -> int:
+    """Deterministic 32-bit RNG seed for a query string"""
+    # Only seeds mock results, so a fast non-cryptographic hash will do;
+    # BLAKE2b is the stdlib fallback when xxhash is not installed
+    data = text.encode()
+    if xxhash:
+        return xxhash.xxh3_64_intdigest(data) & 0xFFFFFFFF
+    return int.from_bytes(hashlib.blake2b(data, digest_size=4).digest(), "little")
 
 
 class MockGoogleSearchAPI:
@@ -29,8 +44,8 @@ class MockGoogleSearchAPI:
         await asyncio.sleep(0.1)  # Simulate API latency
         
         # Generate deterministic results based on query
-        query_hash = hashlib.md5(query.encode()).hexdigest()
-        random.seed(int(query_hash[:8], 16))
+        query_seed = _seed_for(query)
+        random.seed(query_seed)
         
         total_results = random.randint(1000, 1000000)
         
@@ -42,7 +57,7 @@ class MockGoogleSearchAPI:
                 "link": f"https://example.com/result-{rank}",
                 "snippet": f"This is a sample snippet for result {rank} about {query}. It contains relevant information and context.",
                 "displayLink": "example.com",
-                "cacheId": f"cache_{query_hash}_{rank}",
+                "cacheId": f"cache_{query_seed:08x}_{rank}",
                 "mime": "text/html",
                 "htmlSnippet": f"This is a sample snippet for result {rank} about <b>{query}</b>.",
                 "pagemap": {
@@ -94,39 +109,35 @@ class MockPineconeAPI:
         self.request_count += 1
         await asyncio.sleep(0.05)  # Simulate API latency
         
-        # Generate mock matches
-        matches = []
+        # Generate all similar vectors at once, one per row
+        query_vector = np.asarray(vector, dtype=float)
+        count = max(0, min(top_k, 5))
+        match_vectors = query_vector + np.random.normal(0, 0.1, (count, query_vector.size))
+        match_vectors /= np.linalg.norm(match_vectors, axis=1, keepdims=True)  # Normalize
         
-        # Create some deterministic matches
-        query_vector = np.array(vector)
+        # Calculate similarities, clipped at zero
+        scores = np.maximum(match_vectors @ query_vector, 0.0)
+        categories = [random.choice(["AI", "ML", "NLP", "CV"]) for _ in range(count)]
         
-        for i in range(min(top_k, 5)):
-            # Generate a similar vector
-            match_vector = query_vector + np.random.normal(0, 0.1, len(vector))
-            match_vector = match_vector / np.linalg.norm(match_vector)  # Normalize
-            
-            # Calculate similarity
-            similarity = float(np.dot(query_vector, match_vector))
-            
+        # Sort by score descending
+        matches = []
+        for i in np.argsort(-scores, kind="stable").tolist():
             match = {
                 "id": f"doc_{i+1}",
-                "score": max(0.0, similarity),
+                "score": float(scores[i]),
                 "metadata": {
                     "title": f"Document {i+1}",
                     "content": f"This is the content of document {i+1}",
-                    "category": random.choice(["AI", "ML", "NLP", "CV"]),
+                    "category": categories[i],
                     "date": "2024-01-01"
                 }
             }
             
             if include_values:
-                match["values"] = match_vector.tolist()
+                match["values"] = match_vectors[i].tolist()
             
             matches.append(match)
         
-        # Sort by score descending
-        matches.sort(key=lambda x: x["score"], reverse=True)
-        
         return {
             "matches": matches,
             "namespace": namespace
@@ -195,8 +206,7 @@ class MockElasticsearchAPI:
         # Generate deterministic results
         if "multi_match" in query:
             query_text = query["multi_match"]["query"]
-            query_hash = hashlib.md5(query_text.encode()).hexdigest()
-            random.seed(int(query_hash[:8], 16))
+            random.seed(_seed_for(query_text))
             
             for i in range(min(size, 8)):
                 doc_id = f"doc_{from_param + i + 1}"
@@ -272,13 +282,12 @@ class MockElasticsearchAPI:
         self.request_count += 1
         await asyncio.sleep(0.05)
         
-        # Parse NDJSON
-        lines = body.strip().split('\n')
-        operations = len(lines) // 2
+        # Count NDJSON lines (an action line plus a source line per operation)
+        # without splitting the body into a list of strings
+        operations = (body.strip().count('\n') + 1) // 2
         
-        items = []
-        for i in range(operations):
-            items.append({
+        items = [
+            {
                 "index": {
                     "_index": "test",
                     "_type": "_doc",
@@ -287,7 +296,9 @@ class MockElasticsearchAPI:
                     "result": "created",
                     "status": 201
                 }
-            })
+            }
+            for i in range(operations)
+        ]
         
         return {
             "took": random.randint(10, 100),
@@ -313,6 +324,38 @@ class MockElasticsearchAPI:
         }
 
 
+class MockRedisPipeline:
+    """Mock Redis pipeline that queues commands and sends them together"""
+    
+    def __init__(self, redis: "MockRedisAPI"):
+        self.redis = redis
+        self.commands = []
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, *exc_info):
+        self.commands.clear()
+    
+    def setex(self, key: str, time: int, value: str) -> "MockRedisPipeline":
+        """Queue a set with expiration"""
+        self.commands.append((key, value, time))
+        return self
+    
+    async def execute(self) -> List[bool]:
+        """Run all queued commands"""
+        await asyncio.sleep(0.001)  # One round trip for the whole batch
+        
+        results = []
+        for key, value, ex in self.commands:
+            self.redis.data[key] = value
+            self.redis.expires[key] = datetime.now().timestamp() + ex
+            results.append(True)
+        
+        self.commands.clear()
+        return results
+
+
 class MockRedisAPI:
     """Mock Redis API"""
     
@@ -332,6 +375,21 @@ class MockRedisAPI:
             self.stats["misses"] += 1
             return None
     
+    async def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Get values for several keys in one round trip"""
+        await asyncio.sleep(0.001)
+        
+        values = []
+        for key in keys:
+            if key in self.data:
+                self.stats["hits"] += 1
+                values.append(self.data[key])
+            else:
+                self.stats["misses"] += 1
+                values.append(None)
+        
+        return values
+    
     async def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
         """Set key-value pair"""
         await asyncio.sleep(0.001)
@@ -346,6 +404,10 @@ class MockRedisAPI:
         """Set with expiration"""
         return await self.set(key, value, time)
     
+    def pipeline(self, transaction: bool = True) -> MockRedisPipeline:
+        """Create a pipeline for batching commands"""
+        return MockRedisPipeline(self)
+    
     async def delete(self, *keys: str) -> int:
         """Delete keys"""
         await asyncio.sleep(0.001)
@@ -367,6 +429,14 @@ class MockRedisAPI:
         pattern = pattern.replace("*", "")
         return [k for k in self.data.keys() if pattern in k]
     
+    async def scan_iter(self, match: Optional[str] = None, count: Optional[int] = None):
+        """Iterate over keys matching a glob pattern"""
+        await asyncio.sleep(0.001)
+        
+        for key in list(self.data.keys()):
+            if match is None or fnmatch.fnmatchcase(key, match):
+                yield key
+    
     async def flushdb(self) -> bool:
         """Clear database"""
         await asyncio.sleep(0.001)
@@ -392,4 +462,8 @@ class MockRedisAPI:
     
     async def ping(self) -> bool:
         """Ping Redis"""
-        return True
\ No newline at end of file
+        return True
+    
+    async def close(self):
+        """Close connection (no-op for the mock)"""
+        pass
\ No newline at end of file
@@ -1,11 +1,15 @@
 """Mock spell checker for testing"""
 
 import re
-from typing import Dict, List
+from typing import Dict, List, Optional
 import asyncio
 from difflib import SequenceMatcher
 
 
+# Words and the runs of non-word characters between them
+_TOKEN_RE = re.compile(r'\b\w+\b|\W+')
+
+
 class MockSpellChecker:
     """Mock spell checker with comprehensive dictionary"""
     
@@ -109,11 +113,22 @@ class MockSpellChecker:
             "method", "approach", "technique", "framework", "system",
             "performance", "accuracy", "precision", "recall", "score"
         }
+        
+        # One matcher per candidate word, so its lookup tables are built once
+        # instead of on every comparison; iteration order is kept for ties
+        self._valid_matchers = [
+            (valid_word, SequenceMatcher(None, "", valid_word))
+            for valid_word in self.valid_words
+        ]
+        self._typo_matchers = [
+            (typo, SequenceMatcher(None, "", typo))
+            for typo in self.corrections
+        ]
     
     async def correct(self, text: str) -> str:
         """Correct spelling in text"""
         # Split text into words, preserving punctuation
-        words = re.findall(r'\b\w+\b|\W+', text)
+        words = _TOKEN_RE.findall(text)
         corrected_words = []
         
         for word in words:
@@ -130,7 +145,7 @@ class MockSpellChecker:
                     corrected_words.append(corrected)
                 else:
                     # Check for fuzzy matches
-                    corrected = await self._fuzzy_correct(word_lower)
+                    corrected = self._fuzzy_correct(word_lower)
                     if corrected != word_lower:
                         # Apply case preservation
                         if word.isupper():
@@ -148,7 +163,7 @@ class MockSpellChecker:
         
         return ''.join(corrected_words)
     
-    async def _fuzzy_correct(self, word: str) -> str:
+    def _fuzzy_correct(self, word: str) -> str:
         """Find best fuzzy match for word"""
         if len(word) < 3:
             return word
@@ -157,23 +172,33 @@ class MockSpellChecker:
         best_ratio = 0.0
         
         # Check against valid words
-        for valid_word in self.valid_words:
+        for valid_word, matcher in self._valid_matchers:
             if abs(len(word) - len(valid_word)) <= 2:  # Similar length
-                ratio = SequenceMatcher(None, word, valid_word).ratio()
-                if ratio > 0.8 and ratio > best_ratio:
+                ratio = self._ratio_above(matcher, word, max(0.8, best_ratio))
+                if ratio is not None:
                     best_ratio = ratio
                     best_match = valid_word
         
         # Check against correction keys
-        for typo in self.corrections:
+        for typo, matcher in self._typo_matchers:
             if abs(len(word) - len(typo)) <= 1:
-                ratio = SequenceMatcher(None, word, typo).ratio()
-                if ratio > 0.85 and ratio > best_ratio:
+                ratio = self._ratio_above(matcher, word, max(0.85, best_ratio))
+                if ratio is not None:
                     best_ratio = ratio
                     best_match = self.corrections[typo]
         
         return best_match if best_ratio > 0.8 else word
     
+    @staticmethod
+    def _ratio_above(matcher: SequenceMatcher, word: str, cutoff: float) -> Optional[float]:
+        """Get word's similarity ratio if it beats cutoff, else None"""
+        matcher.set_seq1(word)
+        # Cheap upper bounds first, as difflib.get_close_matches does
+        if matcher.real_quick_ratio() <= cutoff or matcher.quick_ratio() <= cutoff:
+            return None
+        ratio = matcher.ratio()
+        return ratio if ratio > cutoff else None
+    
     def is_misspelled(self, word: str) -> bool:
         """Check if word is misspelled"""
         word_lower = word.lower()
@@ -190,9 +215,9 @@ class MockSpellChecker:
         suggestions = []
         
         # Find similar words
-        for valid_word in self.valid_words:
-            ratio = SequenceMatcher(None, word_lower, valid_word).ratio()
-            if ratio > 0.6:
+        for valid_word, matcher in self._valid_matchers:
+            ratio = self._ratio_above(matcher, word_lower, 0.6)
+            if ratio is not None:
                 suggestions.append((valid_word, ratio))
         
         # Sort by similarity and return top 3
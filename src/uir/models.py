@@ -1,9 +1,9 @@
 """Data models for UIR framework"""
 
 from enum import Enum
-from typing import Dict, List, Any, Optional, Union
+from typing import ClassVar, Dict, FrozenSet, List, Any, Mapping, Optional, Tuple, Union
 from datetime import datetime
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, PrivateAttr
 
 
 class ProviderType(str, Enum):
@@ -84,6 +84,37 @@ class Provider(str, Enum):
     DRUID = "druid"
 
 
+class _MemoizedModel(BaseModel):
+    """Model whose private attrs memoize values derived from its fields"""
+    # Private attrs reset to None when one of _memo_fields (default: any field)
+    # is assigned, or changed by model_copy(update=...)
+    _memo_attrs: ClassVar[Tuple[str, ...]] = ()
+    _memo_fields: ClassVar[Optional[FrozenSet[str]]] = None
+    
+    @classmethod
+    def _affects_memos(cls, name: str) -> bool:
+        """Check whether a field feeds the memoized values"""
+        if cls._memo_fields is None:
+            return name in cls.model_fields
+        return name in cls._memo_fields
+    
+    def __setattr__(self, name: str, value: Any):
+        super().__setattr__(name, value)
+        if self._affects_memos(name):
+            self._clear_memos()
+    
+    def model_copy(self, *, update: Optional[Mapping[str, Any]] = None, deep: bool = False):
+        copied = super().model_copy(update=update, deep=deep)
+        if update and any(self._affects_memos(name) for name in update):
+            copied._clear_memos()
+        return copied
+    
+    def _clear_memos(self):
+        """Forget memoized values so they are recomputed from the fields"""
+        for attr in self._memo_attrs:
+            setattr(self, attr, None)
+
+
 class CacheOptions(BaseModel):
     """Cache configuration options"""
     enabled: bool = True
@@ -120,7 +151,7 @@ class SearchOptions(BaseModel):
     deduplicate: bool = True
 
 
-class SearchResult(BaseModel):
+class SearchResult(_MemoizedModel):
     """Individual search result"""
     id: str
     title: Optional[str] = None
@@ -133,6 +164,13 @@ class SearchResult(BaseModel):
     highlights: Optional[List[str]] = None
     explanation: Optional[str] = None
     vector: Optional[List[float]] = None
+    
+    # Derived keys memoized by the aggregator; not part of the serialized model
+    _content_hash: Optional[int] = PrivateAttr(default=None)
+    _domain: Optional[str] = PrivateAttr(default=None)
+    _lowered: Optional[Tuple[str, str, str]] = PrivateAttr(default=None)
+    _memo_attrs: ClassVar[Tuple[str, ...]] = ("_content_hash", "_domain", "_lowered")
+    _memo_fields: ClassVar[Optional[FrozenSet[str]]] = frozenset({"url", "title", "content", "snippet"})
 
 
 class ResponseMetadata(BaseModel):
@@ -200,6 +238,33 @@ class SearchResponse(BaseModel):
     query_id: Optional[str] = None
 
 
+class BatchSearchRequest(BaseModel):
+    """Several text searches sent in one call"""
+    queries: List[SearchRequest]
+    options: Optional[Dict[str, Any]] = None  # parallel
+
+
+class BatchSearchResponse(BaseModel):
+    """Responses to a batch search, in query order"""
+    results: List[SearchResponse]
+
+
+class RAGChunk(BaseModel):
+    """Context chunk returned for RAG pipelines"""
+    text: Optional[str] = None
+    source: str
+    score: float
+    metadata: Optional[Dict[str, Any]] = None
+
+
+class RAGResponse(BaseModel):
+    """Retrieved context for RAG pipelines"""
+    status: str
+    context: str
+    chunks: List[RAGChunk]
+    metadata: Dict[str, Any]  # providers_queried, query_time_ms
+
+
 class IndexRequest(BaseModel):
     """Document indexing request"""
     provider: str
@@ -2,6 +2,7 @@
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import httpx
 import structlog
 
 from ..models import SearchResult, ProviderHealth, ProviderConfig
@@ -13,8 +14,8 @@ logger = structlog.get_logger()
 class ElasticsearchAdapter(ProviderAdapter):
     """Adapter for Elasticsearch"""
     
-    def __init__(self, config: ProviderConfig):
-        super().__init__(config)
+    def __init__(self, config: ProviderConfig, client: Optional[httpx.AsyncClient] = None):
+        super().__init__(config, client)
         self.host = config.credentials.get("host", "localhost")
         self.port = config.credentials.get("port", 9200)
         self.username = config.credentials.get("username")
@@ -2,6 +2,7 @@
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import httpx
 import structlog
 
 from ..models import SearchResult, ProviderHealth, ProviderConfig
@@ -14,8 +15,8 @@ logger = structlog.get_logger()
 class GoogleAdapter(ProviderAdapter):
     """Adapter for Google Custom Search API"""
     
-    def __init__(self, config: ProviderConfig):
-        super().__init__(config)
+    def __init__(self, config: ProviderConfig, client: Optional[httpx.AsyncClient] = None):
+        super().__init__(config, client)
         self.api_key = config.credentials.get("api_key")
         self.cx = config.credentials.get("cx")  # Custom search engine ID
         self.base_url = "https://www.googleapis.com/customsearch/v1"
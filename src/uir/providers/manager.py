@@ -1,6 +1,7 @@
 """Provider management and health monitoring"""
 
 import asyncio
+import time
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
 import structlog
@@ -79,9 +80,9 @@ class ProviderManager:
             )
         
         try:
-            start_time = datetime.now()
+            start_time = time.monotonic()
             health = await adapter.health_check()
-            latency_ms = (datetime.now() - start_time).total_seconds() * 1000
+            latency_ms = (time.monotonic() - start_time) * 1000
             
             # Update latency in health status
             health.latency_ms = latency_ms
@@ -198,4 +199,7 @@ class ProviderManager:
             try:
                 await adapter.close()
             except Exception as e:
-                self.logger.error(f"Error closing adapter: {e}")
\ No newline at end of file
+                self.logger.error(f"Error closing adapter: {e}")
+        
+        # Adapters share the factory's client, so close it last
+        await ProviderFactory.close()
\ No newline at end of file
@@ -2,6 +2,7 @@
 
 from typing import Dict, List, Any, Optional
 from datetime import datetime
+import httpx
 import structlog
 import numpy as np
 
@@ -14,8 +15,8 @@ logger = structlog.get_logger()
 class PineconeAdapter(ProviderAdapter):
     """Adapter for Pinecone vector database"""
     
-    def __init__(self, config: ProviderConfig):
-        super().__init__(config)
+    def __init__(self, config: ProviderConfig, client: Optional[httpx.AsyncClient] = None):
+        super().__init__(config, client)
         self.api_key = config.credentials.get("api_key")
         self.environment = config.credentials.get("environment", "us-west1-gcp")
         self.index_name = config.credentials.get("index_name", "default")
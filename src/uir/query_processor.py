@@ -108,7 +108,9 @@ class QueryProcessor:
     
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate text embedding"""
-        return await self.embedding_service.embed(text)
+        embedding = await self.embedding_service.embed(text)
+        # Keep wire-facing embeddings as plain lists of floats
+        return embedding.tolist() if hasattr(embedding, "tolist") else embedding
     
     def generate_filters(
         self,
@@ -148,25 +150,32 @@ class QueryProcessor:
         return hashlib.sha256(content.encode()).hexdigest()
 
 
+_CORRECTIONS = {
+    "transformr": "transformer",
+    "atention": "attention",
+    "mechanizm": "mechanism",
+    "serch": "search",
+    "databse": "database"
+}
+
+# Every correction in one pattern, so text is scanned once
+_CORRECTION_RE = re.compile(
+    r'\b(?:' + '|'.join(map(re.escape, _CORRECTIONS)) + r')\b',
+    re.IGNORECASE
+)
+
+
 class SpellChecker:
     """Simple spell checker"""
     
     async def correct(self, text: str) -> str:
         """Correct spelling errors"""
         # Simple implementation - in production would use proper spell checker
-        corrections = {
-            "transformr": "transformer",
-            "atention": "attention",
-            "mechanizm": "mechanism",
-            "serch": "search",
-            "databse": "database"
-        }
-        
-        result = text
-        for wrong, right in corrections.items():
-            result = re.sub(r'\b' + wrong + r'\b', right, result, flags=re.IGNORECASE)
-        
-        return result
+        return _CORRECTION_RE.sub(lambda m: _CORRECTIONS[m.group().lower()], text)
+
+
+_DATE_RE = re.compile(r'\b(\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4})\b')
+_EMAIL_RE = re.compile(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b')
 
 
 class EntityExtractor:
@@ -178,8 +187,7 @@ class EntityExtractor:
         
         # Simple pattern-based extraction
         # Date patterns
-        date_pattern = r'\b(\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4})\b'
-        for match in re.finditer(date_pattern, text):
+        for match in _DATE_RE.finditer(text):
             entities.append({
                 "text": match.group(),
                 "type": "DATE",
@@ -188,8 +196,7 @@ class EntityExtractor:
             })
         
         # Email patterns
-        email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-        for match in re.finditer(email_pattern, text):
+        for match in _EMAIL_RE.finditer(text):
             entities.append({
                 "text": match.group(),
                 "type": "EMAIL",
@@ -1,9 +1,9 @@
 """Request router and orchestration service"""
 
 import asyncio
+import time
 import uuid
 from typing import Dict, List, Any, Optional, Union
-from datetime import datetime
 import structlog
 
 from .models import (
@@ -41,15 +41,17 @@ class RouterService:
         self.cache_manager = cache_manager
         self.logger = logger.bind(service="router")
     
-    async def search(self, request: SearchRequest) -> SearchResponse:
-        """Handle standard search request"""
+    async def search(self, request: SearchRequest, use_cache: bool = True) -> SearchResponse:
+        """Handle standard search request; use_cache=False skips the cache lookup and store"""
         request_id = str(uuid.uuid4())
-        start_time = datetime.now()
+        start_time = time.monotonic()
+        use_cache = use_cache and self.cache_manager and request.options and request.options.cache
         
         try:
-            # Check cache if enabled
-            if self.cache_manager and request.options and request.options.cache:
-                cached_result = await self.cache_manager.get(request)
+            # Check cache if enabled; the key is computed once for get and set
+            if use_cache:
+                cache_key = self.cache_manager.cache_key(request)
+                cached_result = await self.cache_manager.get(request, cache_key)
                 if cached_result:
                     self.logger.info("Cache hit", request_id=request_id)
                     return cached_result
@@ -141,7 +143,7 @@ class RouterService:
                 request_id=request_id,
                 results=final_results,
                 metadata=ResponseMetadata(
-                    query_time_ms=int((datetime.now() - start_time).total_seconds() * 1000),
+                    query_time_ms=int((time.monotonic() - start_time) * 1000),
                     providers_used=successful_providers,
                     providers_failed=failed_providers if failed_providers else None,
                     cache_hit=False,
@@ -153,8 +155,8 @@ class RouterService:
             )
             
             # Store in cache
-            if self.cache_manager and request.options and request.options.cache:
-                await self.cache_manager.set(request, response)
+            if use_cache:
+                await self.cache_manager.set(request, response, cache_key)
             
             return response
             
@@ -169,7 +171,7 @@ class RouterService:
     async def vector_search(self, request: VectorSearchRequest) -> SearchResponse:
         """Handle vector search request"""
         request_id = str(uuid.uuid4())
-        start_time = datetime.now()
+        start_time = time.monotonic()
         
         try:
             # Get vector (generate from text if needed)
@@ -230,7 +232,7 @@ class RouterService:
                 request_id=request_id,
                 results=final_results,
                 metadata=ResponseMetadata(
-                    query_time_ms=int((datetime.now() - start_time).total_seconds() * 1000),
+                    query_time_ms=int((time.monotonic() - start_time) * 1000),
                     providers_used=successful_providers,
                     providers_failed=failed_providers if failed_providers else None,
                     cache_hit=False
@@ -248,7 +250,7 @@ class RouterService:
     async def hybrid_search(self, request: HybridSearchRequest) -> SearchResponse:
         """Handle hybrid search combining multiple strategies"""
         request_id = str(uuid.uuid4())
-        start_time = datetime.now()
+        start_time = time.monotonic()
         
         try:
             # Execute each strategy in parallel
@@ -305,7 +307,7 @@ class RouterService:
                 request_id=request_id,
                 results=final_results,
                 metadata=ResponseMetadata(
-                    query_time_ms=int((datetime.now() - start_time).total_seconds() * 1000),
+                    query_time_ms=int((time.monotonic() - start_time) * 1000),
                     providers_used=[s.provider for s in request.strategies],
                     cache_hit=False
                 )
@@ -352,7 +354,7 @@ class RouterService:
         self,
         request_id: str,
         error_message: str,
-        start_time: datetime
+        start_time: float
     ) -> SearchResponse:
         """Create error response"""
         return SearchResponse(
@@ -360,7 +362,7 @@ class RouterService:
             request_id=request_id,
             results=[],
             metadata=ResponseMetadata(
-                query_time_ms=int((datetime.now() - start_time).total_seconds() * 1000),
+                query_time_ms=int((time.monotonic() - start_time) * 1000),
                 providers_used=[],
                 cache_hit=False
             ),
@@ -2,6 +2,7 @@
 
 import pytest
 import asyncio
+import fnmatch
 from typing import Dict, List, Any
 from datetime import datetime
 import json
@@ -269,9 +270,36 @@ def mock_redis_client():
         async def get(self, key):
             return self.data.get(key)
         
+        async def mget(self, keys):
+            return [self.data.get(key) for key in keys]
+        
         async def setex(self, key, ttl, value):
             self.data[key] = value
         
+        def pipeline(self, transaction=True):
+            data = self.data
+            
+            class Pipeline:
+                def __init__(self):
+                    self.commands = []
+                
+                async def __aenter__(self):
+                    return self
+                
+                async def __aexit__(self, *exc_info):
+                    pass
+                
+                def setex(self, key, ttl, value):
+                    self.commands.append((key, value))
+                    return self
+                
+                async def execute(self):
+                    for key, value in self.commands:
+                        data[key] = value
+                    return [True] * len(self.commands)
+            
+            return Pipeline()
+        
         async def delete(self, *keys):
             for key in keys:
                 self.data.pop(key, None)
@@ -279,6 +307,11 @@ def mock_redis_client():
         async def keys(self, pattern):
             return [k for k in self.data.keys() if pattern.replace("*", "") in k]
         
+        async def scan_iter(self, match=None, count=None):
+            for key in list(self.data.keys()):
+                if match is None or fnmatch.fnmatchcase(key, match):
+                    yield key
+        
         async def flushdb(self):
             self.data.clear()
         
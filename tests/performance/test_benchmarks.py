@@ -8,7 +8,7 @@ from unittest.mock import AsyncMock, MagicMock
 from src.uir.router import RouterService
 from src.uir.query_processor import QueryProcessor
 from src.uir.aggregator import ResultAggregator
-from src.uir.cache import CacheManager
+from src.uir.cache import CacheManager, _CacheEntry
 from src.uir.models import SearchRequest, SearchResult
 
 
@@ -143,10 +143,7 @@ class TestCacheBenchmarks:
         
         # Pre-populate cache
         request = SearchRequest(provider="test", query=benchmark_data["query"])
-        cache.local_cache["test_key"] = {
-            "data": "test_data",
-            "expires_at": time.time() + 3600
-        }
+        cache.local_cache["test_key"] = _CacheEntry("test_data", time.monotonic() + 3600)
         
         async def cache_get():
             return await cache.get(request)
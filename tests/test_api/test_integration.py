@@ -121,6 +121,81 @@ class TestAPIEndpoints:
         assert len(data["results"]) == 1
         assert data["results"][0]["title"] == "Test Result"
     
+    @patch('src.uir.api.main.cache_manager')
+    @patch('src.uir.api.main.router_service')
+    def test_batch_search(self, mock_router, mock_cache, test_client, auth_headers):
+        """Test batch search serves cache hits and searches only the misses"""
+        def make_response(request_id):
+            return SearchResponse(
+                status="success",
+                request_id=request_id,
+                results=[],
+                metadata=ResponseMetadata(
+                    query_time_ms=100,
+                    providers_used=["google"],
+                    cache_hit=False
+                )
+            )
+        
+        mock_cache.get_many = AsyncMock(return_value=[make_response("cached"), None])
+        mock_cache.set_many = AsyncMock()
+        mock_cache.cache_key = MagicMock(side_effect=lambda request: f"key:{request.query}")
+        mock_router.search = AsyncMock(side_effect=[make_response("fresh-1"), make_response("fresh-2")])
+        
+        cached_options = {"cache": {"enabled": True}}
+        response = test_client.post(
+            "/batch/search",
+            json={
+                "queries": [
+                    {"provider": "google", "query": "first", "options": cached_options},
+                    {"provider": "google", "query": "second", "options": cached_options},
+                    {"provider": "google", "query": "third"}
+                ],
+                "options": {"parallel": True}
+            },
+            headers=auth_headers
+        )
+        
+        assert response.status_code == 200
+        results = response.json()["results"]
+        assert [r["request_id"] for r in results] == ["cached", "fresh-1", "fresh-2"]
+        mock_cache.get_many.assert_awaited_once()
+        assert mock_cache.get_many.call_args[0][1] == ["key:first", "key:second"]
+        assert mock_router.search.await_count == 2
+        for call in mock_router.search.await_args_list:
+            assert call.kwargs == {"use_cache": False}
+        
+        # Only the cacheable miss is stored, in a single batched write
+        mock_cache.set_many.assert_awaited_once()
+        stored = mock_cache.set_many.call_args[0][0]
+        assert [(req.query, resp.request_id) for req, resp in stored] == [("second", "fresh-1")]
+        assert mock_cache.set_many.call_args[0][1] == ["key:second"]
+    
+    @patch('src.uir.api.main.router_service')
+    def test_batch_search_client_errors(self, mock_router, test_client, auth_headers):
+        """Test batch search reports bad queries and missing permissions as client errors"""
+        mock_router.search = AsyncMock()
+        
+        response = test_client.post(
+            "/batch/search",
+            json={"queries": [{"provider": "google"}]},
+            headers=auth_headers
+        )
+        assert response.status_code == 422
+        
+        api_key = auth_manager.create_api_key(
+            user_id="batch-user",
+            permissions=["vector_search"],
+            rate_limit=1000
+        )
+        response = test_client.post(
+            "/batch/search",
+            json={"queries": [{"provider": "google", "query": "q"}]},
+            headers={"Authorization": f"Bearer {api_key}"}
+        )
+        assert response.status_code == 403
+        mock_router.search.assert_not_awaited()
+    
     @patch('src.uir.api.main.router_service')
     def test_vector_search(self, mock_router, test_client, auth_headers):
         """Test vector search endpoint"""
@@ -302,6 +377,13 @@ class TestAPIEndpoints:
         assert "context" in data
         assert "chunks" in data
         assert len(data["chunks"]) > 0
+        assert data["chunks"][0] == {
+            "text": "Content for RAG",
+            "source": "1",
+            "score": 0.9,
+            "metadata": None
+        }
+        assert data["metadata"]["providers_queried"] == ["elasticsearch"]
     
     # Temporarily disabled - failing due to rate limit interaction with permission check
     # def test_permission_denied(self, test_client):
@@ -1,8 +1,10 @@
 """Tests for authentication and authorization"""
 
 import pytest
+import time
 from datetime import datetime, timedelta
 from jose import jwt
+from unittest.mock import patch
 
 from src.uir.auth import AuthManager, RateLimitManager
 
@@ -56,6 +58,31 @@ class TestAuthManager:
         key_data = auth_manager.validate_api_key("invalid-key")
         assert key_data is None
     
+    def test_validate_api_key_forged_signature(self, auth_manager):
+        """Test API keys with a tampered signature are rejected"""
+        api_key = auth_manager.create_api_key(user_id="test-user")
+        token, _, signature = api_key.rpartition(".")
+        forged = f"{token}.{'A' if signature[0] != 'A' else 'B'}{signature[1:]}"
+        
+        assert auth_manager.validate_api_key(forged) is None
+        assert auth_manager.validate_api_key(api_key) is not None
+    
+    def test_validate_api_key_other_secret(self, auth_manager):
+        """Test API keys issued under another secret are rejected"""
+        other_manager = AuthManager(secret_key="other-secret-key")
+        api_key = other_manager.create_api_key(user_id="test-user")
+        
+        assert auth_manager.validate_api_key(api_key) is None
+    
+    def test_hash_api_key_deterministic(self, auth_manager):
+        """Test API key hashing is deterministic so lookups by hash work"""
+        api_key = auth_manager.create_api_key(user_id="test-user")
+        
+        key_hash = auth_manager._hash_api_key(api_key)
+        assert key_hash == auth_manager._hash_api_key(api_key)
+        assert api_key not in key_hash
+        assert len(auth_manager.api_keys) == 1
+    
     def test_validate_api_key_expired(self, auth_manager):
         """Test expired API key validation"""
         api_key = auth_manager.create_api_key(
@@ -66,6 +93,22 @@ class TestAuthManager:
         key_data = auth_manager.validate_api_key(api_key)
         assert key_data is None
     
+    def test_validate_api_key_cached(self, auth_manager):
+        """Test repeat validations reuse the cached lookup but still count usage"""
+        api_key = auth_manager.create_api_key(user_id="test-user")
+        assert auth_manager.validate_api_key(api_key)["usage_count"] == 1
+        
+        with patch.object(auth_manager, "_lookup_api_key") as lookup:
+            key_data = auth_manager.validate_api_key(api_key)
+            lookup.assert_not_called()
+        assert key_data["usage_count"] == 2
+        
+        # Once the entry expires the key is looked up again
+        auth_manager.api_keys.clear()
+        later = time.monotonic() + auth_manager.validation_cache_ttl + 1
+        with patch("src.uir.auth.time.monotonic", return_value=later):
+            assert auth_manager.validate_api_key(api_key) is None
+    
     def test_create_access_token(self, auth_manager):
         """Test JWT access token creation"""
         data = {"user_id": "test-user", "role": "admin"}
@@ -241,6 +284,14 @@ class TestAuthManager:
         # Non-existent user
         user = auth_manager.get_user_by_id("invalid-id")
         assert user is None
+        
+        # Re-creating a user retires the old ID
+        new_user_id = auth_manager.create_user(
+            email="test@example.com",
+            password="password"
+        )
+        assert auth_manager.get_user_by_id(user_id) is None
+        assert auth_manager.get_user_by_id(new_user_id)["email"] == "test@example.com"
 
 
 class TestRateLimitManager:
@@ -326,4 +377,17 @@ class TestRateLimitManager:
         assert rate_limiter.check_rate_limit("key1", 2) == False
         
         # key2 should also be at limit
-        assert rate_limiter.check_rate_limit("key2", 2) == False
\ No newline at end of file
+        assert rate_limiter.check_rate_limit("key2", 2) == False
+    
+    def test_check_rate_limit_concurrent(self, rate_limiter):
+        """Test that concurrent threads never exceed the limit"""
+        from concurrent.futures import ThreadPoolExecutor
+        
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            allowed = list(executor.map(
+                lambda _: rate_limiter.check_rate_limit("shared-key", 100),
+                range(400)
+            ))
+        
+        assert sum(allowed) == 100
+        assert rate_limiter.get_remaining_requests("shared-key", 100) == 0
\ No newline at end of file
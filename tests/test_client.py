@@ -94,7 +94,7 @@ class TestUIRClient:
         call_args = mock_post.call_args
         assert call_args[0][0] == "/search"
         
-        request_data = call_args[1]["json"]
+        request_data = json.loads(call_args[1]["content"])
         assert request_data["provider"] == "google"
         assert request_data["query"] == "test query"
         assert request_data["options"]["limit"] == 10
@@ -138,7 +138,7 @@ class TestUIRClient:
         call_args = mock_post.call_args
         assert call_args[0][0] == "/vector/search"
         
-        request_data = call_args[1]["json"]
+        request_data = json.loads(call_args[1]["content"])
         assert request_data["provider"] == "pinecone"
         assert request_data["text"] == "semantic search"
         assert request_data["index"] == "documents"
@@ -177,7 +177,7 @@ class TestUIRClient:
         call_args = mock_post.call_args
         assert call_args[0][0] == "/hybrid/search"
         
-        request_data = call_args[1]["json"]
+        request_data = json.loads(call_args[1]["content"])
         assert len(request_data["strategies"]) == 2
         assert request_data["fusion_method"] == "reciprocal_rank"
     
@@ -268,7 +268,7 @@ class TestUIRClient:
         call_args = mock_post.call_args
         assert call_args[0][0] == "/documents/index"
         
-        request_data = call_args[1]["json"]
+        request_data = json.loads(call_args[1]["content"])
         assert request_data["provider"] == "elasticsearch"
         assert len(request_data["documents"]) == 2
         assert request_data["index_name"] == "test-index"
@@ -318,6 +318,29 @@ class TestUIRClient:
         assert responses[0].metadata.providers_used == ["google"]
         assert responses[1].metadata.providers_used == ["bing"]
     
+    @patch.object(httpx.AsyncClient, 'post')
+    @pytest.mark.asyncio
+    async def test_batch_search_async(self, mock_post, client, mock_response):
+        """Test client-side concurrent batch search"""
+        mock_post.return_value = AsyncMock(
+            json=lambda: mock_response,
+            raise_for_status=lambda: None
+        )
+        
+        queries = [
+            {"provider": "google", "query": "query 1"},
+            {"provider": "bing", "query": "query 2", "limit": 5}
+        ]
+        
+        responses = await client.batch_search_async(queries, rerank=True)
+        
+        assert len(responses) == 2
+        assert all(isinstance(r, SearchResponse) for r in responses)
+        sent = [json.loads(call[1]["content"]) for call in mock_post.call_args_list]
+        assert [r["query"] for r in sent] == ["query 1", "query 2"]
+        assert sent[1]["options"]["limit"] == 5
+        assert all(r["options"]["rerank"] for r in sent)
+    
     @patch.object(httpx.Client, 'get')
     def test_get_providers(self, mock_get, client):
         """Test get providers method"""
@@ -385,6 +408,24 @@ class TestUIRClient:
             assert client.config.api_key == "test-key"
             assert client.client is not None
     
+    @pytest.mark.asyncio
+    async def test_async_client_created_lazily(self):
+        """Test the async HTTP client is only built on first use"""
+        client = UIR(api_key="test-key")
+        assert client._async_client is None
+        
+        async_client = client.async_client
+        assert isinstance(async_client, httpx.AsyncClient)
+        assert client.async_client is async_client
+        
+        # close() only touches the sync client; aclose() tears down both
+        client.close()
+        assert client._async_client is async_client
+        
+        await client.aclose()
+        assert client._async_client is None
+        assert async_client.is_closed
+    
     @pytest.mark.asyncio
     async def test_async_context_manager(self):
         """Test client as async context manager"""
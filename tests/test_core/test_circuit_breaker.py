@@ -2,9 +2,10 @@
 
 import pytest
 import asyncio
+import time
 from datetime import datetime, timedelta
 
-from src.uir.core.circuit_breaker import CircuitBreaker, CircuitState
+from src.uir.core.circuit_breaker import CircuitBreaker, CircuitOpenError, CircuitState
 
 
 class TestCircuitBreaker:
@@ -153,4 +154,46 @@ class TestCircuitBreaker:
             await cb.call(other_failing_func)
         
         assert cb.get_state() == CircuitState.CLOSED
-        assert cb.failure_count == 0
\ No newline at end of file
+        assert cb.failure_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_open_error(self):
+        """Test open circuit rejects calls with CircuitOpenError"""
+        cb = CircuitBreaker(failure_threshold=1, recovery_timeout=60)
+        
+        async def failing_func():
+            raise Exception("Test failure")
+        
+        assert not cb.is_open()
+        
+        with pytest.raises(Exception):
+            await cb.call(failing_func)
+        
+        assert cb.is_open()
+        with pytest.raises(CircuitOpenError):
+            await cb.call(failing_func)
+        
+        # Once the recovery timeout passes the breaker lets a probe through
+        cb.last_failure_ns = time.monotonic_ns() - 61 * 1_000_000_000
+        assert not cb.is_open()
+    
+    @pytest.mark.asyncio
+    async def test_circuit_breaker_concurrent_probes_transition_once(self):
+        """Test concurrent calls after recovery share a single half-open transition"""
+        cb = CircuitBreaker(failure_threshold=1, recovery_timeout=60, half_open_max_calls=2)
+        
+        async def failing_func():
+            raise Exception("Test failure")
+        
+        async def slow_success():
+            await asyncio.sleep(0.01)
+            return "success"
+        
+        with pytest.raises(Exception):
+            await cb.call(failing_func)
+        cb.last_failure_ns = time.monotonic_ns() - 61 * 1_000_000_000
+        
+        results = await asyncio.gather(cb.call(slow_success), cb.call(slow_success))
+        
+        assert results == ["success", "success"]
+        assert cb.get_state() == CircuitState.CLOSED
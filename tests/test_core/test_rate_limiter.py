@@ -3,6 +3,8 @@
 import pytest
 import asyncio
 import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 from src.uir.core.rate_limiter import RateLimiter, TokenBucket, SlidingWindowRateLimiter
 
@@ -48,6 +50,19 @@ class TestTokenBucket:
         # Should fail when no tokens available
         assert bucket.try_acquire(1) == False
     
+    def test_token_bucket_try_acquire_threads(self):
+        """Test concurrent threads never take more tokens than the bucket holds"""
+        bucket = TokenBucket(capacity=500, refill_rate=1)
+        
+        def worker():
+            return sum(bucket.try_acquire() for _ in range(200))
+        
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            granted = sum(pool.map(lambda _: worker(), range(8)))
+        
+        # Only the initial capacity plus a token or two of refill
+        assert 500 <= granted <= 502
+    
     @pytest.mark.asyncio
     async def test_token_bucket_blocking(self):
         """Test blocking when tokens unavailable"""
@@ -109,6 +124,68 @@ class TestRateLimiter:
         # Should use default for unknown operations
         await limiter.acquire("unknown_op", 5)
         assert limiter.buckets["default"].tokens == 5
+    
+    @pytest.mark.asyncio
+    async def test_rate_limiter_shards(self):
+        """Test sharded buckets split the limit and are picked by key"""
+        limiter = RateLimiter({"search": 10}, shards=2)
+        first, second = limiter.shards["search"]
+        assert first.capacity == second.capacity == 5
+        assert first.refill_rate == second.refill_rate == 5
+        
+        # The same key always lands on the same shard
+        await limiter.acquire("search", 2, key=1)
+        await limiter.acquire("search", 2, key=1)
+        assert second.tokens == pytest.approx(1, abs=0.01)
+        assert first.tokens == 5
+        
+        # Without a key, shards are used in turn
+        assert limiter.try_acquire("search", 3)
+        assert limiter.try_acquire("search", 3) is False
+        assert first.tokens == pytest.approx(2, abs=0.01)
+    
+    def test_rate_limiter_shards_add_up_to_limit(self):
+        """Test shards never admit more than the limit and reject impossible requests"""
+        limiter = RateLimiter({"search": 10, "rare": 2}, shards=4)
+        assert [b.capacity for b in limiter.shards["search"]] == [3, 3, 2, 2]
+        assert sum(b.refill_rate for b in limiter.shards["search"]) == 10
+        
+        # Fewer requests than shards: one shard per request
+        assert len(limiter.shards["rare"]) == 2
+        assert sum(limiter.try_acquire("rare") for _ in range(4)) == 2
+        
+        # More tokens than a shard can ever hold fails fast instead of waiting forever
+        with pytest.raises(ValueError):
+            limiter.try_acquire("search", 3, key=2)
+        assert limiter.try_acquire("search", 3, key=0)
+        with pytest.raises(ValueError):
+            asyncio.run(limiter.acquire("search", 11))
+    
+    def test_rate_limiter_resolves_operation_once(self):
+        """Test operation lookups are remembered, including the default fallback"""
+        limiter = RateLimiter({"search": 10, "default": 10})
+        
+        assert limiter.try_acquire("unknown_op", 4)
+        assert limiter.try_acquire("unknown_op", 4)
+        assert limiter.buckets["default"].tokens == pytest.approx(2, abs=0.01)
+        assert limiter._resolved["unknown_op"][0] is limiter.shards["default"]
+        
+        # Without a default bucket, unknown operations are not limited
+        assert RateLimiter({"search": 1}).try_acquire("unknown_op", 100)
+    
+    @pytest.mark.asyncio
+    async def test_rate_limiter_bound_acquire(self):
+        """Test per-operation acquire methods draw from that operation's bucket"""
+        limiter = RateLimiter({"search": 10, "default": 10})
+        
+        await limiter.acquire_search(4)
+        assert limiter.buckets["search"].tokens == pytest.approx(6, abs=0.01)
+        assert limiter.buckets["default"].tokens == 10
+        
+        # Unknown operations bind to the default bucket
+        acquire_other = limiter.acquirer("other")
+        await acquire_other()
+        assert limiter.buckets["default"].tokens == pytest.approx(9, abs=0.01)
 
 
 class TestSlidingWindowRateLimiter:
@@ -124,7 +201,7 @@ class TestSlidingWindowRateLimiter:
             await limiter.acquire()
         
         # Should have 5 requests in window
-        assert len(limiter.requests) == 5
+        assert limiter.current_count == 5
     
     @pytest.mark.asyncio
     async def test_sliding_window_blocking(self):
@@ -165,6 +242,37 @@ class TestSlidingWindowRateLimiter:
     #     # Should fail when limit reached
     #     assert limiter.try_acquire() == False
     
+    def test_sliding_window_weighted_previous(self):
+        """Test the previous window counts in proportion to its overlap"""
+        limiter = SlidingWindowRateLimiter(max_requests=4, window_seconds=10)
+        limiter.previous_count = 4
+        
+        # A fifth into the new window, 3.2 of the previous 4 still count
+        limiter.window_start = time.monotonic() - 2
+        assert limiter.try_acquire() == True
+        assert limiter.try_acquire() == False
+        
+        # After a whole idle window nothing from before is left
+        limiter.window_start -= 20
+        assert limiter.try_acquire() == True
+        assert limiter.previous_count == 0
+    
+    @pytest.mark.asyncio
+    async def test_sliding_window_wait_capped(self):
+        """Test a retry never sleeps longer than one window"""
+        limiter = SlidingWindowRateLimiter(max_requests=1, window_seconds=1)
+        limiter.current_count = 1
+        limiter.window_start = time.monotonic() + 100  # Window far ahead of the clock
+        
+        async def fake_sleep(seconds):
+            # Let the window pass so the retry is admitted
+            limiter.window_start = time.monotonic() - 1.5
+        
+        with patch("src.uir.core.rate_limiter.asyncio.sleep", side_effect=fake_sleep) as sleep:
+            await limiter.acquire()
+        
+        sleep.assert_awaited_once_with(1)
+    
     @pytest.mark.asyncio
     async def test_sliding_window_cleanup(self):
         """Test sliding window cleans up old requests"""
@@ -180,5 +288,6 @@ class TestSlidingWindowRateLimiter:
         # Add new request - should trigger cleanup
         await limiter.acquire()
         
-        # Should only have 1 request (old ones cleaned up)
-        assert len(limiter.requests) == 1
\ No newline at end of file
+        # Old requests only count, weighted, as the previous window
+        assert limiter.current_count == 1
+        assert limiter.previous_count == 3
\ No newline at end of file
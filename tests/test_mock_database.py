@@ -0,0 +1,197 @@
+"""Tests for the in-memory mock database"""
+
+import json
+import pytest
+from collections import Counter
+from datetime import datetime, timedelta
+
+from src.uir.mocks.database import MockDatabase, UserRow
+
+
+class TestMockDatabase:
+    """Test mock database storage and lookups"""
+    
+    @pytest.fixture
+    async def db(self):
+        """Create an initialized mock database"""
+        database = MockDatabase()
+        await database.initialize()
+        return database
+    
+    @pytest.mark.asyncio
+    async def test_restore_json_round_trip_backup(self, db):
+        """Test a backup that went through JSON restores rows, history and usage"""
+        user_id = await db.create_user({"email": "a@example.com", "name": "A"})
+        await db.log_query({"user_id": user_id, "query": "transformers"})
+        await db.log_query({"user_id": user_id, "query": "attention"})
+        await db.log_usage({"user_id": user_id, "provider": "google", "operation": "search", "tokens_used": 7})
+        
+        # Rows become plain dicts and datetimes become strings
+        backup = json.loads(json.dumps(
+            await db.backup_data(deep=True),
+            default=lambda value: value.to_dict() if hasattr(value, "to_dict") else str(value)
+        ))
+        
+        restored = MockDatabase()
+        assert await restored.restore_data(backup)
+        assert isinstance(restored.tables["users"][user_id], UserRow)
+        assert (await restored.get_user_by_email("a@example.com"))["name"] == "A"
+        assert (await restored.get_provider_by_name("google"))["type"] == "search_engine"
+        assert [q["query"] for q in await restored.get_query_history(user_id)] == ["attention", "transformers"]
+        
+        stats = await restored.get_usage_stats(
+            user_id=user_id,
+            start_date=datetime.now() - timedelta(hours=1),
+            end_date=datetime.now()
+        )
+        assert stats["total_requests"] == 1
+        assert stats["total_tokens"] == 7
+    
+    @pytest.mark.asyncio
+    async def test_restore_failure_keeps_data(self, db):
+        """Test a backup that fails to load leaves the database unchanged"""
+        await db.create_user({"email": "a@example.com"})
+        broken = {
+            "tables": {
+                "users": {"x": {"id": "x", "email": "b@example.com"}},
+                "usage_metrics": [{"user_id": "x", "provider": "google"}]  # no timestamp
+            }
+        }
+        
+        assert await db.restore_data(broken) is False
+        assert await db.get_user_by_email("a@example.com") is not None
+        assert await db.get_user_by_email("b@example.com") is None
+        assert await db.get_provider_by_name("google") is not None
+    
+    @pytest.mark.asyncio
+    async def test_lookups_follow_updates(self, db):
+        """Test indexed lookups see updated fields and drop the old values"""
+        user_id = await db.create_user({"email": "old@example.com"})
+        assert await db.update_user(user_id, {"email": "new@example.com", "tier": "pro"})
+        
+        assert await db.get_user_by_email("old@example.com") is None
+        user = await db.get_user_by_email("new@example.com")
+        assert user["id"] == user_id
+        assert user["tier"] == "pro"
+        
+        provider_id = await db.create_provider({"name": "bing", "status": "active"})
+        assert await db.update_provider(provider_id, {"name": "bing-v2"})
+        assert await db.get_provider_by_name("bing") is None
+        assert (await db.get_provider_by_name("bing-v2"))["id"] == provider_id
+        
+        key_id = await db.create_api_key({"key_hash": "h1", "user_id": user_id})
+        assert await db.update_api_key_usage(key_id)
+        key = await db.get_api_key_by_hash("h1")
+        assert key["usage_count"] == 1
+        assert key["last_used"] is not None
+        
+        # Returned records are snapshots; editing one doesn't reach the table
+        user["email"] = "edited@example.com"
+        assert await db.get_user_by_email("new@example.com") is not None
+    
+    @pytest.mark.asyncio
+    async def test_lookup_with_duplicate_values(self, db):
+        """Test records sharing an email resolve to the first and survive updates"""
+        first = await db.create_user({"email": "shared@example.com"})
+        second = await db.create_user({"email": "shared@example.com"})
+        assert (await db.get_user_by_email("shared@example.com"))["id"] == first
+        
+        await db.update_user(second, {"email": "second@example.com"})
+        assert (await db.get_user_by_email("shared@example.com"))["id"] == first
+        
+        await db.update_user(second, {"email": "shared@example.com"})
+        await db.update_user(first, {"email": "first@example.com"})
+        assert (await db.get_user_by_email("shared@example.com"))["id"] == second
+        assert (await db.get_user_by_email("first@example.com"))["id"] == first
+    
+    @pytest.mark.asyncio
+    async def test_query_history_paging(self, db):
+        """Test history pages run newest first and respect offset and limit"""
+        for i in range(5):
+            await db.log_query({"user_id": "u1", "query": f"q{i}"})
+        await db.log_query({"user_id": "u2", "query": "other"})
+        
+        async def page(limit, offset):
+            return [q["query"] for q in await db.get_query_history("u1", limit=limit, offset=offset)]
+        
+        assert await page(100, 0) == ["q4", "q3", "q2", "q1", "q0"]
+        assert await page(2, 0) == ["q4", "q3"]
+        assert await page(2, 2) == ["q2", "q1"]
+        assert await page(2, 4) == ["q0"]
+        assert await page(2, 5) == []
+        assert await db.get_query_history("missing") == []
+    
+    @pytest.mark.asyncio
+    async def test_usage_stats_date_ranges(self, db, monkeypatch):
+        """Test range and user-filtered stats match a scan of the raw metrics"""
+        base = datetime(2024, 1, 1, 10, 0)
+        clock = {"now": base}
+        
+        class FakeDatetime(datetime):
+            @classmethod
+            def now(cls, tz=None):
+                return clock["now"]
+        
+        monkeypatch.setattr("src.uir.mocks.database.datetime", FakeDatetime)
+        
+        # Metrics every 20 minutes over four hours
+        for i in range(12):
+            clock["now"] = base + timedelta(minutes=20 * i)
+            await db.log_usage({
+                "user_id": f"u{i % 2}",
+                "provider": ["google", "pinecone", "elasticsearch"][i % 3],
+                "operation": "search" if i % 4 else "index",
+                "tokens_used": i
+            })
+        
+        def expected(user_id=None, start=None, end=None):
+            metrics = [
+                m for m in db.tables["usage_metrics"]
+                if (not user_id or m["user_id"] == user_id)
+                and (not start or m["timestamp"] >= start)
+                and (not end or m["timestamp"] <= end)
+            ]
+            return {
+                "total_requests": len(metrics),
+                "total_tokens": sum(m["tokens_used"] for m in metrics),
+                "by_provider": dict(Counter(m["provider"] for m in metrics)),
+                "by_operation": dict(Counter(m["operation"] for m in metrics))
+            }
+        
+        ranges = [
+            (None, None, None),
+            ("u1", None, None),
+            (None, base + timedelta(minutes=30), base + timedelta(minutes=150)),  # partial hours
+            (None, base + timedelta(hours=1), base + timedelta(hours=3)),  # whole hours, inclusive end
+            ("u0", base + timedelta(minutes=10), base + timedelta(hours=2)),
+            (None, base + timedelta(minutes=200), None),
+            (None, None, base + timedelta(minutes=40)),
+            ("missing", None, None)
+        ]
+        for user_id, start, end in ranges:
+            stats = await db.get_usage_stats(user_id=user_id, start_date=start, end_date=end)
+            for key, value in expected(user_id, start, end).items():
+                assert stats[key] == value, (user_id, start, end, key)
+    
+    @pytest.mark.asyncio
+    async def test_clear_and_restore_rebuild_indexes(self, db):
+        """Test clear_table and restore_data leave lookups consistent with the tables"""
+        user_id = await db.create_user({"email": "a@example.com"})
+        await db.log_query({"user_id": user_id, "query": "q"})
+        await db.log_usage({"user_id": user_id, "provider": "google", "operation": "search", "tokens_used": 3})
+        backup = await db.backup_data()
+        
+        assert await db.clear_table("users")
+        assert await db.get_user_by_email("a@example.com") is None
+        assert await db.clear_table("query_history")
+        assert await db.get_query_history(user_id) == []
+        assert await db.clear_table("usage_metrics")
+        assert (await db.get_usage_stats())["total_requests"] == 0
+        assert (await db.get_usage_stats(user_id=user_id))["total_tokens"] == 0
+        
+        assert await db.restore_data(backup)
+        assert (await db.get_user_by_email("a@example.com"))["id"] == user_id
+        assert [q["query"] for q in await db.get_query_history(user_id)] == ["q"]
+        stats = await db.get_usage_stats(user_id=user_id)
+        assert stats["total_requests"] == 1
+        assert stats["by_provider"] == {"google": 1}
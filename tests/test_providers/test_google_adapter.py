@@ -1,10 +1,13 @@
 """Tests for Google Custom Search adapter"""
 
 import pytest
+import time
 from unittest.mock import AsyncMock, MagicMock, patch
 
 from src.uir.providers.google import GoogleAdapter
 from src.uir.models import SearchResult, ProviderHealth
+from src.uir.core.adapter import ProviderFactory
+from src.uir.core.circuit_breaker import CircuitOpenError, CircuitState
 
 
 class TestGoogleAdapter:
@@ -203,4 +206,38 @@ class TestGoogleAdapter:
         date_range = {
             "start": (datetime.now() - timedelta(days=200)).isoformat()
         }
-        assert adapter._format_date_range(date_range) == "y1"
\ No newline at end of file
+        assert adapter._format_date_range(date_range) == "y1"
+    
+    @pytest.mark.asyncio
+    async def test_google_open_circuit_skips_rate_limit(self, google_config):
+        """Test an open circuit fails fast without rate limiting or retries"""
+        google_config.circuit_breaker_config = {"failure_threshold": 1, "recovery_timeout": 60}
+        adapter = GoogleAdapter(google_config)
+        adapter.circuit_breaker.state = CircuitState.OPEN
+        adapter.circuit_breaker.failure_count = 1
+        adapter.circuit_breaker.last_failure_ns = time.monotonic_ns()
+        adapter._acquire_rate_limit = AsyncMock()
+        adapter._make_request = AsyncMock()
+        
+        with pytest.raises(CircuitOpenError):
+            await adapter._execute_request("GET", "https://www.googleapis.com/customsearch/v1")
+        
+        adapter._acquire_rate_limit.assert_not_called()
+        adapter._make_request.assert_not_called()
+    
+    @pytest.mark.asyncio
+    async def test_google_factory_shares_client(self, google_config):
+        """Test factory-created adapters share one client the factory closes"""
+        ProviderFactory.register("google", GoogleAdapter)
+        first = ProviderFactory.create(google_config)
+        second = ProviderFactory.create(google_config)
+        
+        assert first.client is second.client
+        
+        # Closing an adapter leaves the shared client open for the others
+        await first.close()
+        assert not second.client.is_closed
+        
+        await ProviderFactory.close()
+        assert second.client.is_closed
+        assert ProviderFactory._shared_client is None